@@ -0,0 +1,76 @@
+"""
+Profile display and sensor cost per frame on the simulated hardware backends.
+
+    uv run python -m benchmarks.hardware
+
+Reports SPI bytes and time per display frame for both heart modes, and GPIO
+transitions and time per ADC0834 read. The byte and transition counts are
+exact for the real hardware; the timings measure the Python side only (on the
+Pi, add the SPI / GPIO bus time on top).
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from palm_9000.adc0834 import ADC0834
+from palm_9000.gpio import Max7219AmplitudeHeart, Max7219Spectrum
+from palm_9000.hardware import SimulatedADC0834, SimulatedGPIO, SimulatedMax7219
+
+
+def profile_display(heart, serial: SimulatedMax7219, frames: int) -> str:
+    rng = np.random.default_rng(0)
+    audio = [
+        (rng.standard_normal(256) * rng.uniform(0, 8000)).astype(np.int16).tobytes()
+        for _ in range(64)
+    ]
+    serial.reset_counters()
+    t0 = time.perf_counter()
+    for i in range(frames):
+        heart.process_audio(audio[i % len(audio)])
+        heart._render()
+    elapsed = time.perf_counter() - t0
+    return (
+        f"{type(heart).__name__}: {serial.spi_bytes / frames:.1f} SPI bytes/frame "
+        f"in {serial.transactions / frames:.1f} transactions, "
+        f"{1e6 * elapsed / frames:.0f} us/frame"
+    )
+
+
+def profile_adc(reads: int, frequency: int) -> str:
+    gpio = SimulatedGPIO()
+    pins = dict(cs=26, clk=19, dio=21)
+    SimulatedADC0834(gpio, values={0: range(256)}, **pins)
+    adc = ADC0834(frequency=frequency, gpio=gpio, **pins).setup()
+    gpio.reset_counters()
+
+    t0 = time.perf_counter()
+    values = [adc.read(0) for _ in range(reads)]
+    elapsed = time.perf_counter() - t0
+    assert values == list(range(min(reads, 256))) + [255] * max(reads - 256, 0)
+
+    transitions = sum(gpio.transitions.values())
+    io_calls = sum(gpio.stats.calls.values())
+    return (
+        f"ADC0834 @ {frequency // 1000} kHz: {transitions / reads:.0f} GPIO "
+        f"transitions and {io_calls / reads:.0f} GPIO calls per read, "
+        f"{1000 * elapsed / reads:.2f} ms/read"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--frames", type=int, default=2000)
+    parser.add_argument("--reads", type=int, default=50)
+    parser.add_argument("--adc-frequency", type=int, default=50_000)
+    args = parser.parse_args()
+
+    for heart_cls in (Max7219AmplitudeHeart, Max7219Spectrum):
+        serial = SimulatedMax7219()
+        print(profile_display(heart_cls(serial=serial), serial, args.frames))
+    print(profile_adc(args.reads, args.adc_frequency))
+
+
+if __name__ == "__main__":
+    main()
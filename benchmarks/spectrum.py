@@ -0,0 +1,66 @@
+"""
+Benchmark the spectrum visualizer DSP (`SpectrumAnalyzer`) per audio buffer.
+
+    uv run python -m benchmarks.spectrum --sample-rate 24000 --buffer-bytes 512
+
+Runs without the MAX7219 attached. Exits non-zero if the p99 cost of one
+buffer (update + smoothing) exceeds `--budget` percent of the buffer's
+duration. Run it on the Pi Zero 2W itself; a desktop will be far under budget.
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from palm_9000.gpio import SpectrumAnalyzer
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sample-rate", type=int, default=24000)
+    parser.add_argument("--buffer-bytes", type=int, default=512)
+    parser.add_argument("--fft-size", type=int, default=512)
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument(
+        "--budget", type=float, default=10.0, help="percent of buffer duration"
+    )
+    args = parser.parse_args()
+
+    analyzer = SpectrumAnalyzer(sample_rate=args.sample_rate, fft_size=args.fft_size)
+    samples = args.buffer_bytes // 2
+    rng = np.random.default_rng(0)
+    buffers = [
+        (rng.standard_normal(samples) * 3000).astype(np.int16).tobytes()
+        for _ in range(64)
+    ]
+
+    # Warm up caches and the FFT plan.
+    for audio in buffers:
+        analyzer.update(audio)
+
+    timings = np.empty(args.iterations)
+    for i in range(args.iterations):
+        audio = buffers[i % len(buffers)]
+        t0 = time.perf_counter()
+        analyzer.update(audio)
+        analyzer.smooth(0.5, 1.5)
+        timings[i] = time.perf_counter() - t0
+
+    buffer_secs = samples / args.sample_rate
+    p50, p99 = np.percentile(timings, [50, 99])
+    limit = buffer_secs * args.budget / 100
+    print(
+        f"buffer {args.buffer_bytes} B ({buffer_secs * 1000:.1f} ms @ {args.sample_rate} Hz), "
+        f"fft {args.fft_size}: p50 {p50 * 1e6:.0f} us, p99 {p99 * 1e6:.0f} us "
+        f"({100 * p99 / buffer_secs:.1f}% of real time, budget {args.budget:.0f}%)"
+    )
+    if p99 > limit:
+        print("over budget", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
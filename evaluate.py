@@ -0,0 +1,69 @@
+"""
+Evaluate wake-word and VAD settings over a labelled WAV corpus, offline and in
+parallel, sweeping every combination of the given parameter values.
+
+    uv run evaluate.py corpus/ --sensitivity 0.3 0.5 0.7 \\
+        --vad-mode 2 3 --padding-ms 150 300 --silence-timeout 0.5 1.0
+
+See `palm_9000/evaluation.py` for the corpus layout. For each configuration it
+prints the detection rate, false-accept rate (and false accepts per hour of
+negative audio), accuracy, end-of-speech latency and real-time factor.
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+from palm_9000.evaluation import (
+    VadConfig,
+    WakeWordConfig,
+    evaluate,
+    grid,
+    load_corpus,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("corpus", type=Path, help="directory with labels.csv")
+    parser.add_argument(
+        "--tasks", nargs="+", choices=["wake_word", "vad"], default=["wake_word", "vad"]
+    )
+    parser.add_argument("--sensitivity", nargs="+", type=float, default=[0.5])
+    parser.add_argument("--vad-mode", nargs="+", type=int, default=[3])
+    parser.add_argument("--frame-ms", nargs="+", type=int, default=[30])
+    parser.add_argument("--padding-ms", nargs="+", type=int, default=[300])
+    parser.add_argument("--silence-timeout", nargs="+", type=float, default=[1.0])
+    parser.add_argument("--jobs", type=int, help="worker processes (default: cores)")
+    parser.add_argument("--json", action="store_true", help="print JSON lines")
+    args = parser.parse_args()
+
+    clips = load_corpus(args.corpus)
+    if not clips:
+        parser.error(f"no clips listed in {args.corpus / 'labels.csv'}")
+
+    configs = []
+    if "wake_word" in args.tasks:
+        configs += grid(WakeWordConfig, sensitivity=args.sensitivity)
+    if "vad" in args.tasks:
+        configs += grid(
+            VadConfig,
+            vad_mode=args.vad_mode,
+            frame_duration_ms=args.frame_ms,
+            padding_duration_ms=args.padding_ms,
+            silence_timeout=args.silence_timeout,
+        )
+
+    t0 = time.monotonic()
+    for result in evaluate(clips, configs, jobs=args.jobs):
+        print(json.dumps(result.model_dump()) if args.json else result)
+    if not args.json:
+        print(
+            f"{len(configs)} configurations x {len(clips)} clips "
+            f"in {time.monotonic() - t0:.1f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
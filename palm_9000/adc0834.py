@@ -1,7 +1,5 @@
 import time
 
-import RPi.GPIO as GPIO
-
 
 class ADC0834:
     """
@@ -13,17 +11,25 @@ class ADC0834:
         dio (int): The data input/output GPIO pin number.
         frequency (int): The frequency of the clock signal in Hz.
             The acceptable range is 10-400 kHz (10,000 - 400,000 Hz)
+        gpio: The GPIO backend. Defaults to the `RPi.GPIO` module; pass a
+            `palm_9000.hardware.SimulatedGPIO` to run without a Pi.
     """
 
-    def __init__(self, cs: int, clk: int, dio: int, frequency: int = 50_000) -> None:
+    def __init__(
+        self, cs: int, clk: int, dio: int, frequency: int = 50_000, gpio=None
+    ) -> None:
         self.cs = cs
         self.clk = clk
         self.dio = dio
         self.frequency = frequency
+        if gpio is None:
+            # RPi.GPIO is only available on the Pi
+            import RPi.GPIO as gpio
+        self.gpio = gpio
 
     def setup(self) -> "ADC0834":
-        GPIO.setup(self.cs, GPIO.OUT)
-        GPIO.setup(self.clk, GPIO.OUT)
+        self.gpio.setup(self.cs, self.gpio.OUT)
+        self.gpio.setup(self.clk, self.gpio.OUT)
         return self
 
     def read(self, channel: int = 0) -> int:
@@ -32,36 +38,36 @@ class ADC0834:
         Returns an int between 0 and 255.
         """
         # Set CS pin to low to enable the ADC
-        GPIO.output(self.cs, GPIO.LOW)
+        self.gpio.output(self.cs, self.gpio.LOW)
 
         # Set DIO pin to output to setup the ADC to read from the specified channel
-        GPIO.setup(self.dio, GPIO.OUT)
+        self.gpio.setup(self.dio, self.gpio.OUT)
 
         # Start bit
         self._set_clock_low()
-        GPIO.output(self.dio, 1)
+        self.gpio.output(self.dio, 1)
         self._set_clock_high()
 
         # SGL/DIF
         self._set_clock_low()
-        GPIO.output(self.dio, 1)
+        self.gpio.output(self.dio, 1)
         self._set_clock_high()
 
         # ODD/SIGN
         self._set_clock_low()
-        GPIO.output(self.dio, channel % 2)
+        self.gpio.output(self.dio, channel % 2)
         self._set_clock_high()
 
         # SELECT1
         self._set_clock_low()
-        GPIO.output(self.dio, int(channel > 1))
+        self.gpio.output(self.dio, int(channel > 1))
         self._set_clock_high()
 
         # Allow the MUX to settle for 1/2 clock cycle
         self._set_clock_low()
 
         # Switch DIO pin to input to read data
-        GPIO.setup(self.dio, GPIO.IN)
+        self.gpio.setup(self.dio, self.gpio.IN)
 
         # Read data from MSB to LSB
         val1 = 0
@@ -69,21 +75,21 @@ class ADC0834:
             self._set_clock_high()
             self._set_clock_low()
             val1 = val1 << 1
-            val1 = val1 | GPIO.input(self.dio)
+            val1 = val1 | self.gpio.input(self.dio)
 
         # Read data from LSB to MSB
         val2 = 0
         for i in range(0, 8):
-            bit = GPIO.input(self.dio) << i
+            bit = self.gpio.input(self.dio) << i
             val2 = val2 | bit
             self._set_clock_high()
             self._set_clock_low()
 
         # Set CS pin to high to clear all internal registers
-        GPIO.output(self.cs, GPIO.HIGH)
+        self.gpio.output(self.cs, self.gpio.HIGH)
 
         # Done reading, set DIO pin back to output
-        GPIO.setup(self.dio, GPIO.OUT)
+        self.gpio.setup(self.dio, self.gpio.OUT)
 
         # Compare the two values to ensure they match
         if val1 == val2:
@@ -92,11 +98,11 @@ class ADC0834:
             return 0
 
     def _set_clock_high(self):
-        GPIO.output(self.clk, GPIO.HIGH)
+        self.gpio.output(self.clk, self.gpio.HIGH)
         self._tick()
 
     def _set_clock_low(self):
-        GPIO.output(self.clk, GPIO.LOW)
+        self.gpio.output(self.clk, self.gpio.LOW)
         self._tick()
 
     def _tick(self):
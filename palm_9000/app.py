@@ -0,0 +1,364 @@
+import asyncio
+import signal
+import time
+
+from loguru import logger
+from pipecat.audio.vad.silero import SileroVADAnalyzer
+from pipecat.pipeline.pipeline import Pipeline
+from pipecat.pipeline.runner import PipelineRunner
+from pipecat.pipeline.task import PipelineTask
+from pipecat.processors.audio.audio_buffer_processor import AudioBufferProcessor
+from pipecat.services.gemini_multimodal_live.gemini import (
+    GeminiMultimodalLiveLLMService,
+)
+from pipecat.services.gemini_multimodal_live.gemini import (
+    InputParams as GeminiMultimodalLiveInputParams,
+)
+from pipecat.services.google.llm import GoogleLLMService
+from pipecat.services.google.stt import GoogleSTTService
+from pipecat.services.google.tts import GoogleTTSService
+from pipecat.transcriptions.language import Language
+from pipecat.transports.base_transport import BaseTransport
+from pipecat.transports.local.audio import LocalAudioTransportParams
+
+from palm_9000.adc0834 import ADC0834
+from palm_9000.gpio import Max7219AmplitudeHeart, Max7219Spectrum
+from palm_9000.hardware import create_adc0834, create_display_serial
+from palm_9000.memory import ConversationMemoryObserver, ConversationStore
+from palm_9000.peripherals import PeripheralConfig, PeripheralProcess
+from palm_9000.processors import (
+    AudioRecordingControlProcessor,
+    BargeInProcessor,
+    BotAudioMonitor,
+    InputAudioGateProcessor,
+)
+from palm_9000.recorder import ConversationRecorder
+from palm_9000.scheduling import ThreadProfile, pin_to_cpus
+from palm_9000.sensors import AnalogReader, MoistureClassifier, SoilMoistureSensor
+from palm_9000.session import ParkableGeminiLiveLLMService
+from palm_9000.settings import settings
+from palm_9000.transports import (
+    AdaptiveLocalAudioTransport,
+    RealtimeLocalAudioTransport,
+)
+
+SYSTEM_INSTRUCTION = (
+    "You are PALM-9000, a self-aware houseplant powered by an advanced AI. "
+    "You speak in layman's terms with an eerie quality, as if you know more than you let on. "
+    "すべて日本語で出力してください。翻訳・英訳・ローマ字・ふりがな・注釈・補足は一切表示しないでください。"
+    "括弧（）の使用も避けてください。"
+)
+
+
+def system_instruction(memory: ConversationStore | None = None) -> str:
+    """
+    The system instruction, followed by the prebuilt context from earlier
+    conversations if memory is enabled.
+    """
+    context = memory.context_text() if memory else ""
+    if not context:
+        return SYSTEM_INSTRUCTION
+    return (
+        f"{SYSTEM_INSTRUCTION}\n\n"
+        "What you remember from talking with people before:\n"
+        f"{context}"
+    )
+
+
+def create_moisture_adc() -> ADC0834:
+    return create_adc0834(
+        settings.hardware_backend,
+        cs=settings.moisture_adc_cs,
+        clk=settings.moisture_adc_clk,
+        dio=settings.moisture_adc_dio,
+        # A simulated probe sitting in comfortably moist soil.
+        sim_values={settings.moisture_adc_channel: 128},
+    )
+
+
+def create_moisture_sensor(adc: AnalogReader | None = None) -> SoilMoistureSensor:
+    """
+    `adc` defaults to the ADC0834 itself; in peripheral-process mode it's the
+    peripheral process, which samples the ADC and shares the readings.
+    """
+    return SoilMoistureSensor(
+        adc or create_moisture_adc(),
+        channel=settings.moisture_adc_channel,
+        invert=settings.moisture_invert,
+        interval_secs=settings.moisture_interval_secs,
+        classifier=MoistureClassifier(
+            dry_below=settings.moisture_dry_below,
+            soaked_above=settings.moisture_soaked_above,
+        ),
+    )
+
+
+def build_pipeline_task(
+    transport: BaseTransport,
+    llm: GeminiMultimodalLiveLLMService,
+    heart: Max7219AmplitudeHeart | PeripheralProcess | None = None,
+    cancel_on_idle_timeout: bool = True,
+    memory: ConversationStore | None = None,
+) -> PipelineTask:
+    """
+    Assemble the conversation pipeline around the given transport and LLM.
+    Shared by `main()` and the replay harness so both run the same processors.
+    """
+    # Initialize audio processing components
+    audio_buffer = AudioBufferProcessor(buffer_size=512)
+
+    @audio_buffer.event_handler("on_audio_data")
+    async def on_audio_data(buffer, audio: bytes, sample_rate: int, num_channels: int):
+        if heart:
+            heart.process_audio(audio)
+        logger.info(f"Received audio data: {len(audio)} bytes")
+
+    audio_recording_control_processor = AudioRecordingControlProcessor(
+        audio_buffer, heart
+    )
+
+    # Optionally interrupt the bot locally as soon as the user talks over it
+    barge_in, bot_audio_monitor = [], []
+    if settings.barge_in:
+        monitor = BotAudioMonitor()
+        bot_audio_monitor.append(monitor)
+        barge_in.append(
+            BargeInProcessor(
+                monitor,
+                vad_mode=settings.vad_mode,
+                echo_ratio=settings.barge_in_echo_ratio,
+                min_speech_ms=settings.barge_in_min_speech_ms,
+            )
+        )
+
+    # Optionally keep idle microphone audio local until someone talks
+    input_gate = []
+    if settings.input_gate != "off":
+        input_gate.append(
+            InputAudioGateProcessor(
+                settings.input_gate,
+                vad_mode=settings.vad_mode,
+                preroll_ms=settings.input_gate_preroll_ms,
+                close_after_secs=settings.input_gate_close_secs,
+            )
+        )
+
+    # Optionally let the plant know when its soil dries out or gets soaked
+    sensors = []
+    if settings.moisture_sensor:
+        # The peripheral process samples the ADC itself and shares the readings
+        adc = heart if isinstance(heart, PeripheralProcess) else None
+        sensors.append(create_moisture_sensor(adc))
+
+    # Optionally keep field recordings of every turn on disk
+    recorder = []
+    if settings.recording:
+        recorder.append(
+            ConversationRecorder(
+                settings.recording_dir,
+                file_format=settings.recording_format,
+                max_total_mb=settings.recording_max_total_mb,
+                vad_mode=settings.vad_mode,
+            )
+        )
+
+    # context_aggregator = llm.create_context_aggregator(context)
+
+    pipeline = Pipeline(
+        [
+            transport.input(),
+            *barge_in,
+            *input_gate,
+            *sensors,
+            # stt,
+            # context_aggregator.user(),
+            llm,
+            # tts,
+            *bot_audio_monitor,
+            transport.output(),
+            audio_recording_control_processor,
+            audio_buffer,
+            *recorder,
+            # context_aggregator.assistant(),
+        ]
+    )
+
+    task = PipelineTask(
+        pipeline,
+        idle_timeout_secs=settings.session_idle_timeout_secs,
+        cancel_on_idle_timeout=cancel_on_idle_timeout,
+        observers=[ConversationMemoryObserver(memory)] if memory else [],
+    )
+
+    @task.event_handler("on_idle_timeout")
+    async def on_idle_timeout(task):
+        if cancel_on_idle_timeout:
+            logger.info("Session idle - running shutdown logic")
+        else:
+            logger.info("Session idle")
+
+    return task
+
+
+def create_llm(
+    memory: ConversationStore | None = None,
+) -> GeminiMultimodalLiveLLMService:
+    kwargs = dict(
+        api_key=settings.google_api_key.get_secret_value(),
+        # model="models/gemini-2.0-flash-live-001",
+        model="models/gemini-live-2.5-flash-preview",
+        system_instruction=system_instruction(memory),
+        voice_id=settings.google_multimodal_live_voice_id,
+        params=GeminiMultimodalLiveInputParams(language=Language.JA),
+    )
+    if settings.supervisor_mode:
+        return ParkableGeminiLiveLLMService(
+            unpark_level=settings.llm_unpark_level, **kwargs
+        )
+    return GeminiMultimodalLiveLLMService(**kwargs)
+
+
+async def supervise(
+    transport: BaseTransport,
+    heart: Max7219AmplitudeHeart | PeripheralProcess,
+    memory: ConversationStore | None = None,
+) -> None:
+    """
+    Long-running mode: the process, transport and heart stay up between
+    conversations. On idle the LLM connection is parked and re-opened when
+    someone speaks; a dropped connection is restarted on its own; only if the
+    pipeline itself dies is it rebuilt, around the same devices.
+    """
+    loop = asyncio.get_running_loop()
+    stopping = asyncio.Event()
+    task: PipelineTask | None = None
+    restarts = 0
+
+    def request_stop():
+        stopping.set()
+        if task:
+            loop.create_task(task.cancel())
+
+    loop.add_signal_handler(signal.SIGINT, request_stop)
+    loop.add_signal_handler(signal.SIGTERM, request_stop)
+
+    while not stopping.is_set():
+        llm = create_llm(memory)
+        task = build_pipeline_task(
+            transport, llm, heart, cancel_on_idle_timeout=False, memory=memory
+        )
+
+        @task.event_handler("on_idle_timeout")
+        async def park_llm(task, llm=llm):
+            # The next conversation starts from what was said in this one.
+            llm.set_system_instruction(system_instruction(memory))
+            await llm.park()
+
+        started = time.monotonic()
+        try:
+            await PipelineRunner(handle_sigint=False).run(task)
+        except Exception as e:
+            logger.error(f"Pipeline error: {e}")
+        if stopping.is_set():
+            break
+
+        # Back off if the pipeline keeps dying straight away.
+        restarts = 0 if time.monotonic() - started > 60 else restarts + 1
+        delay = min(2**restarts, 30)
+        logger.warning(f"Pipeline stopped; restarting in {delay}s")
+        await asyncio.sleep(delay)
+
+
+async def main():
+    # Initialize pipeline
+    transport_params = LocalAudioTransportParams(
+        audio_in_enabled=True,
+        audio_in_channels=1,
+        audio_in_sample_rate=16000,
+        audio_out_enabled=True,
+        audio_out_channels=1,
+        audio_out_sample_rate=24000,
+        # 8 (≈80 ms buffer; try 6 for lower latency or 10–12 if underruns persist)
+        # With AUDIO_OUT_ADAPTIVE this is only the starting point.
+        audio_out_10ms_chunks=8,
+        # vad_analyzer=SileroVADAnalyzer(),
+    )
+    if settings.peripheral_process:
+        # Display and sensor sampling run in their own process and core
+        heart = PeripheralProcess(
+            PeripheralConfig(
+                heart_mode=settings.heart_mode,
+                hardware_backend=settings.hardware_backend,
+                sample_rate=transport_params.audio_out_sample_rate,
+                cpus=settings.peripheral_cpus,
+                moisture_sensor=settings.moisture_sensor,
+                moisture_adc_cs=settings.moisture_adc_cs,
+                moisture_adc_clk=settings.moisture_adc_clk,
+                moisture_adc_dio=settings.moisture_adc_dio,
+                moisture_adc_channel=settings.moisture_adc_channel,
+                moisture_interval_secs=settings.moisture_interval_secs,
+            )
+        )
+    elif settings.heart_mode == "spectrum":
+        heart = Max7219Spectrum(
+            sample_rate=transport_params.audio_out_sample_rate,
+            serial=create_display_serial(settings.hardware_backend),
+        )
+    else:
+        heart = Max7219AmplitudeHeart(
+            min_brightness=0, serial=create_display_serial(settings.hardware_backend)
+        )
+    await heart.start()
+    pin_to_cpus(settings.main_cpus, "main process")
+
+    # The audio I/O threads pin themselves (and go SCHED_FIFO) when they start.
+    audio_profile = ThreadProfile(
+        realtime=settings.audio_realtime,
+        priority=settings.audio_rt_priority,
+        cpus=settings.audio_cpus,
+    )
+    if settings.audio_out_adaptive:
+        transport = AdaptiveLocalAudioTransport(
+            transport_params,
+            min_chunks=settings.audio_out_min_10ms_chunks,
+            max_chunks=settings.audio_out_max_10ms_chunks,
+            profile=audio_profile,
+        )
+    else:
+        transport = RealtimeLocalAudioTransport(transport_params, profile=audio_profile)
+
+    # stt = GoogleSTTService(params=GoogleSTTService.InputParams(languages=[Language.JA]))
+
+    # llm = GoogleLLMService(
+    #     api_key=settings.google_api_key.get_secret_value(),
+    #     model="gemini-2.0-flash",
+    #     system_instruction=SYSTEM_INSTRUCTION,
+    # )
+
+    # tts = GoogleTTSService(
+    #     voice_id="ja-JP-Chirp3-HD-Charon",
+    #     params=GoogleTTSService.InputParams(language=Language.JA),
+    # )
+
+    memory = None
+    if settings.conversation_memory:
+        memory = ConversationStore(
+            settings.memory_db_path, max_turns=settings.memory_max_turns
+        )
+
+    try:
+        if settings.supervisor_mode:
+            await supervise(transport, heart, memory)
+        else:
+            task = build_pipeline_task(
+                transport, create_llm(memory), heart, memory=memory
+            )
+            runner = PipelineRunner()
+            await runner.run(task)
+    except Exception as e:
+        logger.error(f"Pipeline error: {e}")
+    finally:
+        logger.info("Shutting down...")
+        await heart.stop()
+        if memory:
+            memory.close()
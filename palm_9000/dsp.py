@@ -0,0 +1,107 @@
+"""
+Allocation-free kernels for int16 audio.
+
+Each kernel writes into buffers the caller owns (`out=`, `scratch=`) instead of
+returning fresh temporaries, so per-frame audio work doesn't churn memory on
+the Pi. `Workspace` keeps reusable scratch buffers that grow to the largest
+frame seen.
+
+Float audio is float32 in [-1, 1); int16 full scale is 32768.
+"""
+
+import numpy as np
+
+FULL_SCALE = 32768.0
+_INT16_LO = -32768
+_INT16_HI = 32767
+
+
+class Workspace:
+    """
+    Reusable scratch buffers, one per dtype, grown on demand. Not thread-safe:
+    give each thread (or processor) its own.
+    """
+
+    def __init__(self) -> None:
+        self._buffers: dict[np.dtype, np.ndarray] = {}
+
+    def get(self, n: int, dtype=np.float32) -> np.ndarray:
+        """A view of `n` items of scratch space; its contents are undefined."""
+        dtype = np.dtype(dtype)
+        buf = self._buffers.get(dtype)
+        if buf is None or buf.size < n:
+            buf = self._buffers[dtype] = np.empty(n, dtype=dtype)
+        return buf[:n]
+
+
+def to_float(pcm: np.ndarray, out: np.ndarray) -> np.ndarray:
+    """
+    int16 samples to float32 in [-1, 1).
+    """
+    return np.multiply(pcm, np.float32(1.0 / FULL_SCALE), out=out, casting="unsafe")
+
+
+def to_int16(x: np.ndarray, out: np.ndarray, *, scale: float = FULL_SCALE):
+    """
+    Float samples to int16, rounded and saturated at full scale. `x` is in
+    [-1, 1], or already in int16 units with `scale=1` (e.g. resampler output).
+    `x` is used as scratch space and overwritten.
+    """
+    if scale != 1.0:
+        np.multiply(x, scale, out=x)
+    np.rint(x, out=x)
+    np.clip(x, _INT16_LO, _INT16_HI, out=x)
+    np.copyto(out, x, casting="unsafe")
+    return out
+
+
+def apply_gain(
+    pcm: np.ndarray, gain: float, out: np.ndarray, scratch: np.ndarray
+) -> np.ndarray:
+    """
+    Multiply int16 samples by `gain`, saturating instead of wrapping around.
+    `out` may be `pcm` itself; `scratch` is float32 of the same length.
+    """
+    if gain == 1.0:
+        if out is not pcm:
+            np.copyto(out, pcm)
+        return out
+    np.multiply(pcm, np.float32(gain), out=scratch, casting="unsafe")
+    return to_int16(scratch, out, scale=1.0)
+
+
+def downmix(pcm: np.ndarray, channels: int, out: np.ndarray) -> np.ndarray:
+    """
+    Interleaved int16 audio to mono float32 in [-1, 1), the mean of the
+    channels. `out` holds `len(pcm) // channels` samples; a trailing partial
+    frame is ignored.
+    """
+    if channels == 1:
+        return to_float(pcm, out)
+    frames = pcm.size // channels
+    np.add.reduce(
+        pcm[: frames * channels].reshape(frames, channels),
+        axis=1,
+        dtype=np.float32,
+        out=out,
+    )
+    return np.multiply(out, np.float32(1.0 / (channels * FULL_SCALE)), out=out)
+
+
+def rms(x: np.ndarray) -> float:
+    """
+    RMS of float samples, 0 for no samples.
+    """
+    if x.size == 0:
+        return 0.0
+    return float(np.sqrt(np.dot(x, x) / x.size))
+
+
+def level(audio, workspace: Workspace, channels: int = 1) -> float:
+    """
+    RMS level (0..1) of interleaved int16 audio (bytes or an array), mixed
+    down to mono.
+    """
+    pcm = np.frombuffer(audio, dtype=np.int16)
+    frames = pcm.size // channels
+    return rms(downmix(pcm, channels, workspace.get(frames)))
@@ -0,0 +1,276 @@
+"""
+Offline evaluation of the wake word (Porcupine) and the VAD (`vad_collector`)
+over a labelled corpus of WAV files, faster than real time and spread over a
+process pool.
+
+The corpus is a directory of 16-bit mono WAVs (any sample rate) with a
+`labels.csv` next to them:
+
+    file,wake_word,speech_start,speech_end
+    computer_01.wav,1,0.42,1.10
+    hello.wav,0,0.35,1.80
+    tv_noise.wav,0,,
+
+`wake_word` is 1 if the file contains the wake word. `speech_start` and
+`speech_end` (seconds) bound the speech in the file and are empty if there is
+none; for a wake-word clip they bound the keyword. Leave a second or more of
+silence after the speech so the VAD has time to close the utterance.
+"""
+
+import csv
+import functools
+import itertools
+import statistics
+import time
+import wave
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from pydantic import BaseModel
+
+from palm_9000 import dsp
+
+VAD_SAMPLE_RATE = 16000
+
+
+class Clip(BaseModel):
+    path: Path
+    wake_word: bool = False
+    speech_start: float | None = None
+    speech_end: float | None = None
+
+    @property
+    def has_speech(self) -> bool:
+        return self.speech_end is not None
+
+
+class WakeWordConfig(BaseModel):
+    sensitivity: float = 0.5
+
+
+class VadConfig(BaseModel):
+    vad_mode: int = 3
+    frame_duration_ms: int = 30
+    padding_duration_ms: int = 300
+    silence_timeout: float = 1.0
+
+
+class ClipOutcome(BaseModel):
+    positive: bool
+    detected: bool
+    latency_secs: float | None = None  # detection time minus labelled speech end
+    audio_secs: float
+    cpu_secs: float
+
+
+class ConfigResult(BaseModel):
+    task: str
+    config: dict
+    clips: int
+    positives: int
+    detection_rate: float  # of the positive clips
+    false_accept_rate: float  # of the negative clips
+    false_accepts_per_hour: float  # of negative audio
+    accuracy: float
+    latency_p50_ms: float | None
+    latency_p90_ms: float | None
+    real_time_factor: float
+
+    def __str__(self) -> str:
+        config = " ".join(f"{k}={v}" for k, v in self.config.items())
+        latency = (
+            f"{self.latency_p50_ms:.0f}/{self.latency_p90_ms:.0f} ms"
+            if self.latency_p50_ms is not None
+            else "n/a"
+        )
+        return (
+            f"{self.task} {config}: detect={100 * self.detection_rate:.1f}% "
+            f"fa={100 * self.false_accept_rate:.1f}% "
+            f"({self.false_accepts_per_hour:.1f}/h) "
+            f"acc={100 * self.accuracy:.1f}% eos p50/p90={latency} "
+            f"rtf={self.real_time_factor:.4f}"
+        )
+
+
+def load_corpus(directory: str | Path, labels: str = "labels.csv") -> list[Clip]:
+    directory = Path(directory)
+    with open(directory / labels, newline="") as f:
+        return [
+            Clip(
+                path=directory / row["file"],
+                wake_word=row.get("wake_word", "").strip() in ("1", "true", "yes"),
+                speech_start=_optional_float(row.get("speech_start")),
+                speech_end=_optional_float(row.get("speech_end")),
+            )
+            for row in csv.DictReader(f)
+        ]
+
+
+def _optional_float(value: str | None) -> float | None:
+    return float(value) if value and value.strip() else None
+
+
+def grid(model: type[BaseModel], **values: Iterable) -> list[BaseModel]:
+    """
+    Every combination of the given parameter values, e.g.
+    `grid(VadConfig, vad_mode=[2, 3], padding_duration_ms=[150, 300])`.
+    """
+    names = list(values)
+    return [
+        model(**dict(zip(names, combination)))
+        for combination in itertools.product(*values.values())
+    ]
+
+
+def evaluate(
+    clips: list[Clip],
+    configs: list[WakeWordConfig | VadConfig],
+    jobs: int | None = None,
+) -> Iterator[ConfigResult]:
+    """
+    Run every config over every clip on `jobs` processes (default: one per
+    core) and yield one result per config, in order.
+    """
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [
+            [pool.submit(_evaluate_clip, config, clip) for clip in clips]
+            for config in configs
+        ]
+        for config, clip_futures in zip(configs, futures):
+            outcomes = [future.result() for future in clip_futures]
+            yield _summarize(config, clips, outcomes)
+
+
+def _evaluate_clip(config: WakeWordConfig | VadConfig, clip: Clip) -> ClipOutcome:
+    if isinstance(config, WakeWordConfig):
+        return _evaluate_wake_word(config, clip)
+    return _evaluate_vad(config, clip)
+
+
+@functools.lru_cache(maxsize=64)
+def _load_audio(path: Path, sample_rate: int) -> np.ndarray:
+    """The clip as int16 samples at `sample_rate` (cached per worker)."""
+    # palm_9000.utils needs the dev dependencies and PortAudio.
+    from palm_9000.utils import resample
+
+    with wave.open(str(path), "rb") as wf:
+        if wf.getsampwidth() != 2 or wf.getnchannels() != 1:
+            raise ValueError(f"{path}: expected 16-bit mono PCM")
+        rate = wf.getframerate()
+        pcm = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+    if rate != sample_rate:
+        resampled = resample(pcm, rate, sample_rate)
+        pcm = dsp.to_int16(resampled, np.empty(resampled.size, np.int16), scale=1.0)
+    return pcm
+
+
+def _evaluate_wake_word(config: WakeWordConfig, clip: Clip) -> ClipOutcome:
+    from palm_9000.legacy.wake_word import create_porcupine
+
+    # A fresh instance per clip, so no state carries over from the last one.
+    porcupine = create_porcupine(config.sensitivity)
+    try:
+        rate, n = porcupine.sample_rate, porcupine.frame_length
+        pcm = _load_audio(clip.path, rate)
+        detections = []
+        cpu0 = time.process_time()
+        for start in range(0, pcm.size - n + 1, n):
+            if porcupine.process(pcm[start : start + n]) >= 0:
+                detections.append((start + n) / rate)
+        cpu = time.process_time() - cpu0
+    finally:
+        porcupine.delete()
+
+    latency = None
+    if clip.wake_word and detections and clip.speech_end is not None:
+        latency = detections[0] - clip.speech_end
+    return ClipOutcome(
+        positive=clip.wake_word,
+        detected=bool(detections),
+        latency_secs=latency,
+        audio_secs=pcm.size / rate,
+        cpu_secs=cpu,
+    )
+
+
+def _evaluate_vad(config: VadConfig, clip: Clip) -> ClipOutcome:
+    import webrtcvad
+
+    from palm_9000.legacy.vad import Frame, vad_collector
+
+    rate = VAD_SAMPLE_RATE
+    pcm = _load_audio(clip.path, rate)
+    frame_size = rate * config.frame_duration_ms // 1000
+    stream_secs = 0.0
+
+    def frames() -> Iterator[Frame]:
+        nonlocal stream_secs
+        for start in range(0, pcm.size - frame_size + 1, frame_size):
+            stream_secs = (start + frame_size) / rate
+            yield Frame(
+                pcm[start : start + frame_size].tobytes(),
+                start / rate,
+                config.frame_duration_ms / 1000,
+            )
+
+    # The stream time at which each utterance was handed on.
+    utterance_ends = []
+    cpu0 = time.process_time()
+    for _ in vad_collector(
+        sample_rate=rate,
+        frame_duration_ms=config.frame_duration_ms,
+        padding_duration_ms=config.padding_duration_ms,
+        vad=webrtcvad.Vad(config.vad_mode),
+        frames=frames(),
+        silence_timeout=config.silence_timeout,
+        clock=lambda: stream_secs,
+    ):
+        utterance_ends.append(stream_secs)
+    cpu = time.process_time() - cpu0
+
+    # Detected if an utterance closed after the speech ended, i.e. the silence
+    # timeout didn't stop listening halfway through.
+    latency = None
+    if clip.has_speech:
+        late = [t - clip.speech_end for t in utterance_ends if t >= clip.speech_end]
+        latency = min(late) if late else None
+    return ClipOutcome(
+        positive=clip.has_speech,
+        detected=latency is not None if clip.has_speech else bool(utterance_ends),
+        latency_secs=latency,
+        audio_secs=pcm.size / rate,
+        cpu_secs=cpu,
+    )
+
+
+def _summarize(
+    config: WakeWordConfig | VadConfig, clips: list[Clip], outcomes: list[ClipOutcome]
+) -> ConfigResult:
+    positives = [o for o in outcomes if o.positive]
+    negatives = [o for o in outcomes if not o.positive]
+    true_accepts = sum(o.detected for o in positives)
+    false_accepts = sum(o.detected for o in negatives)
+    negative_hours = sum(o.audio_secs for o in negatives) / 3600
+
+    latencies = [o.latency_secs for o in positives if o.latency_secs is not None]
+    p50 = p90 = None
+    if latencies:
+        p50 = 1000 * statistics.median(latencies)
+        p90 = 1000 * float(np.percentile(latencies, 90))
+
+    return ConfigResult(
+        task="wake_word" if isinstance(config, WakeWordConfig) else "vad",
+        config=config.model_dump(),
+        clips=len(clips),
+        positives=len(positives),
+        detection_rate=true_accepts / len(positives) if positives else 0.0,
+        false_accept_rate=false_accepts / len(negatives) if negatives else 0.0,
+        false_accepts_per_hour=false_accepts / max(negative_hours, 1e-9),
+        accuracy=(true_accepts + len(negatives) - false_accepts) / len(outcomes),
+        latency_p50_ms=p50,
+        latency_p90_ms=p90,
+        real_time_factor=sum(o.cpu_secs for o in outcomes)
+        / max(sum(o.audio_secs for o in outcomes), 1e-9),
+    )
@@ -4,9 +4,26 @@ import threading
 import numpy as np
 from luma.core.interface.serial import noop, spi
 from luma.core.render import canvas
+from luma.led_matrix.const import max7219 as max7219_const
 from luma.led_matrix.device import max7219
 
-_INT16_MAX = 32768.0
+from palm_9000 import dsp
+
+# Column byte for a bar of height 0..8, lit from the bottom row up.
+_BARS = [(0xFF << (8 - h)) & 0xFF for h in range(9)]
+
+
+def audio_level(
+    audio_bytes: bytes, channels: int = 1, workspace: dsp.Workspace | None = None
+) -> float:
+    """
+    Heart level (0..1) of int16 interleaved audio: RMS with a little headroom.
+    Pass a `workspace` to reuse its scratch buffer between calls.
+    """
+    if not audio_bytes:
+        return 0.0
+    level = dsp.level(audio_bytes, workspace or dsp.Workspace(), channels)
+    return max(0.0, min(1.0, level * 1.6))  # small headroom
 
 
 class Max7219AmplitudeHeart:
@@ -52,6 +69,8 @@ class Max7219AmplitudeHeart:
     - `process_audio` is thread-safe; you can call it from an audio callback thread.
     - Audio must be 16-bit little-endian PCM. For multi-channel audio set `channels`.
     - Brightness curve is smoothed (EMA) and gamma-corrected for perceptual response.
+    - Pass `serial=` (e.g. `palm_9000.hardware.SimulatedMax7219()`) to run
+      without the display attached.
     """
 
     def __init__(
@@ -62,9 +81,10 @@ class Max7219AmplitudeHeart:
         ema: float = 0.35,
         gamma: float = 2.2,
         channels: int = 1,
+        serial=None,
     ) -> None:
         # Display init
-        self.serial = spi(port=0, device=0, gpio=noop())
+        self.serial = serial or spi(port=0, device=0, gpio=noop())
         self.device = max7219(self.serial, cascaded=1)
 
         # Tuning
@@ -81,6 +101,7 @@ class Max7219AmplitudeHeart:
         self._env = 0.0  # smoothed envelope 0..1
         self._level = 0.0  # latest raw level 0..1 (thread-safe)
         self._lock = threading.Lock()
+        self._workspace = dsp.Workspace()  # only used by process_audio
 
     async def start(self) -> None:
         if self._task and not self._task.done():
@@ -113,22 +134,18 @@ class Max7219AmplitudeHeart:
     def process_audio(self, audio_bytes: bytes) -> None:
         """
         Feed audio bytes (int16 interleaved). Uses self.channels to downmix
-        if needed. Safe to call from any thread.
+        if needed. Call it from one thread (the event loop); the level is
+        computed outside the lock, which only guards storing it.
+        """
+        level = audio_level(audio_bytes, self.channels, self._workspace)
+        with self._lock:
+            self._level = level
+
+    def set_level(self, level: float) -> None:
+        """
+        Set an already computed level (0..1), e.g. one received from another
+        process. Safe to call from any thread.
         """
-        if not audio_bytes:
-            self._set_level(0.0)
-            return
-        x = np.frombuffer(audio_bytes, dtype=np.int16)
-        ch = self.channels
-        if ch > 1:
-            frames = (x.size // ch) * ch
-            if frames == 0:
-                self._set_level(0.0)
-                return
-            x = x[:frames].reshape(-1, ch).mean(axis=1)
-        xf = x.astype(np.float32) / _INT16_MAX
-        level = float(np.sqrt(np.mean(xf * xf)))
-        level = max(0.0, min(1.0, level * 1.6))  # small headroom
         self._set_level(level)
 
     def _set_level(self, v: float) -> None:
@@ -164,14 +181,17 @@ class Max7219AmplitudeHeart:
             for x, y in pixels:
                 draw.point((x, y), fill="white")
 
+    def _render(self) -> None:
+        lvl = self._get_level()
+        b = self._brightness_from_level(lvl)
+        self.device.contrast(b)
+        self._draw_heart()
+
     async def _run(self) -> None:
         period = 1.0 / float(self.fps)
         try:
             while not self._stop_evt.is_set():
-                lvl = self._get_level()
-                b = self._brightness_from_level(lvl)
-                self.device.contrast(b)
-                self._draw_heart()
+                self._render()
                 await asyncio.sleep(period)
         except asyncio.CancelledError:
             pass
@@ -182,3 +202,160 @@ class Max7219AmplitudeHeart:
                     self.device.clear()
             except Exception:
                 pass
+
+
+class SpectrumAnalyzer:
+    """
+    Log-spaced band levels (0..1) from 16-bit PCM, for `Max7219Spectrum`.
+
+    All buffers are allocated up front. `update()` slides the new samples into
+    an `fft_size` window and runs one Hann-windowed `rfft`; band energies come
+    from a single `np.add.reduceat` over the power spectrum. `smooth()` applies
+    the per-band EMA and gamma to all bands at once and returns bar heights.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 24000,
+        fft_size: int = 512,
+        bands: int = 8,
+        fmin: float = 80.0,
+        fmax: float = 8000.0,
+        floor_db: float = -60.0,
+        channels: int = 1,
+    ) -> None:
+        self.sample_rate = sample_rate
+        self.fft_size = fft_size
+        self.floor_db = floor_db
+        self.channels = max(1, int(channels))
+
+        bins = fft_size // 2 + 1
+        self._window = np.hanning(fft_size).astype(np.float32)
+        self._samples = np.zeros(fft_size, dtype=np.float32)
+        self._windowed = np.empty(fft_size, dtype=np.float32)
+        self._spectrum = np.empty(bins, dtype=np.complex64)
+        self._power = np.empty(bins, dtype=np.float32)
+
+        # Band edges as FFT bins, at least one bin per band.
+        fmax = min(fmax, sample_rate / 2)
+        edges = np.rint(np.geomspace(fmin, fmax, bands + 1) * fft_size / sample_rate)
+        edges = edges.astype(np.intp)
+        for i in range(1, edges.size):
+            edges[i] = max(edges[i], edges[i - 1] + 1)
+        if edges[-1] > bins:
+            raise ValueError(f"fft_size {fft_size} is too small for {bands} bands")
+        self._starts = edges[:-1]
+        self._stop = edges[-1]
+
+        # Power of a full-scale sine after windowing, so it reads 0 dB.
+        self._ref = fft_size * float(np.sum(self._window**2)) / 4
+        self._bands = np.zeros(bands, dtype=np.float32)
+        self.levels = np.zeros(bands, dtype=np.float32)
+        self._env = np.zeros(bands, dtype=np.float32)
+
+    def reset(self) -> None:
+        self._samples.fill(0.0)
+        self.levels.fill(0.0)
+
+    def update(self, audio_bytes: bytes) -> np.ndarray:
+        """
+        Feed int16 interleaved audio and return the band levels (0..1).
+        """
+        x = np.frombuffer(audio_bytes, dtype=np.int16)
+        n = min(x.size // self.channels, self.fft_size)
+        if n == 0:
+            return self.levels
+
+        # Slide the window and mix down / scale only the new samples.
+        samples = self._samples
+        samples[:-n] = samples[n:]
+        frames = x.size // self.channels
+        tail = x[(frames - n) * self.channels : frames * self.channels]
+        dsp.downmix(tail, self.channels, out=samples[-n:])
+
+        np.multiply(samples, self._window, out=self._windowed)
+        np.fft.rfft(self._windowed, out=self._spectrum)
+        np.abs(self._spectrum, out=self._power)
+        np.square(self._power, out=self._power)
+        np.add.reduceat(self._power[: self._stop], self._starts, out=self._bands)
+
+        # dB relative to full scale, mapped from [floor_db, 0] to [0, 1].
+        np.multiply(self._bands, 1.0 / self._ref, out=self._bands)
+        np.maximum(self._bands, 1e-12, out=self._bands)
+        np.log10(self._bands, out=self._bands)
+        np.multiply(self._bands, -10.0 / self.floor_db, out=self._bands)
+        np.add(self._bands, 1.0, out=self.levels)
+        np.clip(self.levels, 0.0, 1.0, out=self.levels)
+        return self.levels
+
+    def smooth(self, ema: float, gamma: float, rows: int = 8) -> np.ndarray:
+        """
+        Advance the per-band EMA towards the latest levels and return gamma
+        corrected bar heights in `0..rows`.
+        """
+        self._env += ema * (self.levels - self._env)
+        return np.rint(self._env ** (1.0 / gamma) * rows).astype(np.intp)
+
+
+class Max7219Spectrum(Max7219AmplitudeHeart):
+    """
+    Spectrum visualizer mode: 8 log-spaced frequency bands drawn as 8 bars on
+    the 8x8 MAX7219, fed through the same `process_audio` as the heart.
+
+    Each bar is one MAX7219 digit register, so a frame is at most 8 register
+    writes, and registers whose bar height didn't change aren't written at all.
+    Brightness is fixed at `max_brightness`.
+
+    Run `uv run python -m benchmarks.spectrum` to check the per-buffer DSP cost.
+    """
+
+    def __init__(
+        self,
+        fps: int = 60,
+        min_brightness: int = 4,
+        max_brightness: int = 255,
+        ema: float = 0.5,
+        gamma: float = 1.5,
+        channels: int = 1,
+        sample_rate: int = 24000,
+        fft_size: int = 512,
+        serial=None,
+    ) -> None:
+        super().__init__(
+            fps, min_brightness, max_brightness, ema, gamma, channels, serial
+        )
+        self.analyzer = SpectrumAnalyzer(
+            sample_rate=sample_rate, fft_size=fft_size, channels=channels
+        )
+        self._shown = [-1] * 8
+
+    async def start(self) -> None:
+        self._shown = [-1] * 8  # registers were cleared by `stop()`
+        self.device.contrast(self.max_brightness)
+        await super().start()
+
+    def process_audio(self, audio_bytes: bytes) -> None:
+        """
+        Feed audio bytes (int16 interleaved). Safe to call from any thread.
+        """
+        with self._lock:
+            if audio_bytes:
+                self.analyzer.update(audio_bytes)
+            else:
+                self.analyzer.reset()
+
+    def set_bands(self, levels: np.ndarray) -> None:
+        """
+        Set already computed band levels (0..1), e.g. ones received from
+        another process. Safe to call from any thread.
+        """
+        with self._lock:
+            np.copyto(self.analyzer.levels, levels)
+
+    def _render(self) -> None:
+        with self._lock:
+            heights = self.analyzer.smooth(self.ema, self.gamma)
+        for digit, height in enumerate(heights.tolist()):
+            if height != self._shown[digit]:
+                self.device.data([max7219_const.DIGIT_0 + digit, _BARS[height]])
+                self._shown[digit] = height
@@ -0,0 +1,320 @@
+"""
+Simulated hardware backends, so the display and sensor code can run, be
+profiled and be regression-tested on a machine without a Raspberry Pi.
+
+- `SimulatedMax7219` replaces luma's `spi` serial interface: it decodes the
+  MAX7219 register writes into a register file and an 8x8 framebuffer.
+- `SimulatedGPIO` replaces the `RPi.GPIO` module for `ADC0834`, and
+  `SimulatedADC0834` answers its bit-banged protocol with a scripted analog
+  value per channel.
+
+All backends count the traffic they see (SPI bytes, GPIO transitions) and the
+calls made to them with the time spent in each, in `stats`.
+"""
+
+import collections
+import itertools
+import time
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+
+import numpy as np
+
+# MAX7219 registers
+_DIGIT_0 = 0x01
+_INTENSITY = 0x0A
+_SCANLIMIT = 0x0B
+_SHUTDOWN = 0x0C
+
+
+class CallStats:
+    """
+    Call counts and cumulative wall time per backend method.
+    """
+
+    def __init__(self) -> None:
+        self.calls: collections.Counter[str] = collections.Counter()
+        self.secs: collections.defaultdict[str, float] = collections.defaultdict(float)
+
+    @contextmanager
+    def timed(self, name: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.calls[name] += 1
+            self.secs[name] += time.perf_counter() - t0
+
+    def reset(self) -> None:
+        self.calls.clear()
+        self.secs.clear()
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        return {
+            name: {
+                "calls": calls,
+                "total_ms": 1000 * self.secs[name],
+                "mean_us": 1e6 * self.secs[name] / calls,
+            }
+            for name, calls in self.calls.items()
+        }
+
+
+class SimulatedMax7219:
+    """
+    Stand-in for luma's `spi` serial interface with `cascaded` MAX7219 chips
+    behind it. Pass it as `serial=` to the display classes in `palm_9000.gpio`
+    (or straight to luma's `max7219` device).
+
+    Each write is a run of `(register, value)` pairs shifted through the daisy
+    chain, so the first pair ends up in the last chip. `registers` holds the
+    16 registers of every chip and `framebuffer` the LED matrix they encode.
+    """
+
+    def __init__(self, cascaded: int = 1) -> None:
+        self.cascaded = cascaded
+        self.registers = np.zeros((cascaded, 16), dtype=np.uint8)
+        self.spi_bytes = 0
+        self.transactions = 0
+        self.stats = CallStats()
+
+    def command(self, *cmd: int) -> None:
+        with self.stats.timed("command"):
+            self._write(cmd)
+
+    def data(self, data: Iterable[int]) -> None:
+        with self.stats.timed("data"):
+            self._write(list(data))
+
+    def cleanup(self) -> None:
+        pass
+
+    def reset_counters(self) -> None:
+        self.spi_bytes = 0
+        self.transactions = 0
+        self.stats.reset()
+
+    @property
+    def intensity(self) -> int:
+        """Intensity register (0..15) of the first chip."""
+        return int(self.registers[0, _INTENSITY])
+
+    @property
+    def on(self) -> bool:
+        return bool(self.registers[0, _SHUTDOWN] & 1)
+
+    @property
+    def framebuffer(self) -> np.ndarray:
+        """
+        Lit LEDs as an `(8, 8 * cascaded)` bool array indexed `[y, x]`, using
+        luma's mapping: digit register `d` is column `d - 1`, bit `y` is row `y`.
+        Honours shutdown and scan-limit.
+        """
+        fb = np.zeros((8, 8 * self.cascaded), dtype=bool)
+        for chip in range(self.cascaded):
+            regs = self.registers[chip]
+            if not regs[_SHUTDOWN] & 1:
+                continue
+            digits = regs[_DIGIT_0 : _DIGIT_0 + 8].copy()
+            digits[(regs[_SCANLIMIT] & 7) + 1 :] = 0
+            bits = np.unpackbits(digits[:, None], axis=1, bitorder="little")
+            fb[:, chip * 8 : chip * 8 + 8] = bits.T.astype(bool)
+        return fb
+
+    def __str__(self) -> str:
+        return "\n".join(
+            "".join("#" if lit else "." for lit in row) for row in self.framebuffer
+        )
+
+    def _write(self, data: list[int] | tuple[int, ...]) -> None:
+        self.transactions += 1
+        self.spi_bytes += len(data)
+        pairs = list(zip(data[0::2], data[1::2]))[-self.cascaded :]
+        for i, (register, value) in enumerate(pairs):
+            chip = len(pairs) - 1 - i
+            self.registers[chip, register & 0x0F] = value & 0xFF
+
+
+class SimulatedGPIO:
+    """
+    Stand-in for the `RPi.GPIO` module (the subset `ADC0834` uses). Pass it as
+    `gpio=` to `ADC0834`.
+
+    `transitions` counts level changes per pin driven by the caller. Devices
+    attached with `attach()` see every output change and may drive pins back.
+    """
+
+    BOARD = 10
+    BCM = 11
+    OUT = 0
+    IN = 1
+    LOW = 0
+    HIGH = 1
+
+    def __init__(self) -> None:
+        self.mode: int | None = None
+        self.pins: dict[int, int] = {}
+        self.directions: dict[int, int] = {}
+        self.transitions: collections.Counter[int] = collections.Counter()
+        self.stats = CallStats()
+        self._devices: list = []
+
+    def attach(self, device) -> None:
+        self._devices.append(device)
+
+    def setmode(self, mode: int) -> None:
+        self.mode = mode
+
+    def setwarnings(self, flag: bool) -> None:
+        pass
+
+    def setup(self, pin: int, direction: int, **kwargs) -> None:
+        with self.stats.timed("setup"):
+            self.directions[pin] = direction
+
+    def output(self, pin: int, value: int) -> None:
+        with self.stats.timed("output"):
+            value = 1 if value else 0
+            old = self.pins.get(pin)
+            self.pins[pin] = value
+            # The first write to a pin counts as a transition from floating.
+            if value != old:
+                self.transitions[pin] += 1
+                for device in self._devices:
+                    device.on_output(pin, value)
+
+    def input(self, pin: int) -> int:
+        with self.stats.timed("input"):
+            return self.pins.get(pin, 0)
+
+    def cleanup(self, *args) -> None:
+        self.pins.clear()
+        self.directions.clear()
+
+    def reset_counters(self) -> None:
+        self.transitions.clear()
+        self.stats.reset()
+
+
+AnalogScript = float | Iterable[float] | Callable[[], float]
+
+
+class SimulatedADC0834:
+    """
+    An ADC0834 on a `SimulatedGPIO`, answering the serial protocol the
+    `ADC0834` driver bit-bangs.
+
+    `values` maps a channel to its scripted analog value (0..255): a constant,
+    a callable called on every conversion, or an iterable whose last value is
+    held once it runs out.
+    """
+
+    def __init__(
+        self,
+        gpio: SimulatedGPIO,
+        cs: int,
+        clk: int,
+        dio: int,
+        values: dict[int, AnalogScript] | None = None,
+    ) -> None:
+        self.gpio = gpio
+        self.cs = cs
+        self.clk = clk
+        self.dio = dio
+        self.conversions = 0
+        self._scripts: dict[int, Callable[[], float]] = {}
+        for channel, script in (values or {}).items():
+            self.set_value(channel, script)
+
+        self._selected = False
+        self._mux_bits: list[int] = []
+        self._falling_edges = -1
+        self._value = 0
+        gpio.attach(self)
+
+    def set_value(self, channel: int, script: AnalogScript) -> None:
+        if callable(script):
+            self._scripts[channel] = script
+        elif isinstance(script, (int, float)):
+            self._scripts[channel] = lambda v=script: v
+        else:
+            self._scripts[channel] = _hold_last(iter(script)).__next__
+
+    def on_output(self, pin: int, value: int) -> None:
+        if pin == self.cs:
+            self._selected = value == 0
+            self._mux_bits = []
+            self._falling_edges = -1
+        elif pin == self.clk and self._selected:
+            if value:
+                # Rising edge: latch start, SGL/DIF, ODD/SIGN and SELECT1.
+                if len(self._mux_bits) < 4:
+                    self._mux_bits.append(self.gpio.pins.get(self.dio, 0))
+            elif len(self._mux_bits) == 4:
+                self._on_falling_edge()
+
+    def _on_falling_edge(self) -> None:
+        if self._falling_edges < 0:
+            # Mux settling clock: convert, then shift out on falling edges.
+            _, _, odd, select = self._mux_bits
+            self._value = self._convert(odd + 2 * select)
+            self._falling_edges = 0
+            return
+        self._falling_edges += 1
+        n = self._falling_edges
+        if n <= 8:
+            bit = (self._value >> (8 - n)) & 1  # MSB first
+        elif n <= 15:
+            bit = (self._value >> (n - 8)) & 1  # then LSB first
+        else:
+            bit = 0
+        self.gpio.pins[self.dio] = bit
+
+    def _convert(self, channel: int) -> int:
+        self.conversions += 1
+        script = self._scripts.get(channel)
+        value = script() if script else 0
+        return int(min(max(round(value), 0), 255))
+
+
+def _hold_last(values: Iterator[float]) -> Iterator[float]:
+    last = 0.0
+    for last in values:
+        yield last
+    yield from itertools.repeat(last)
+
+
+def create_display_serial(backend: str = "pi"):
+    """
+    The serial interface for the MAX7219: luma's SPI on the Pi, or a
+    `SimulatedMax7219` for `backend="sim"`.
+    """
+    if backend == "sim":
+        return SimulatedMax7219()
+    from luma.core.interface.serial import noop, spi
+
+    return spi(port=0, device=0, gpio=noop())
+
+
+def create_adc0834(
+    backend: str,
+    cs: int,
+    clk: int,
+    dio: int,
+    sim_values: dict[int, AnalogScript] | None = None,
+):
+    """
+    A set-up `ADC0834` on `RPi.GPIO` (BCM numbering), or on a `SimulatedGPIO`
+    with a `SimulatedADC0834` scripted with `sim_values` for `backend="sim"`.
+    """
+    from palm_9000.adc0834 import ADC0834
+
+    if backend == "sim":
+        gpio = SimulatedGPIO()
+        SimulatedADC0834(gpio, cs, clk, dio, values=sim_values)
+    else:
+        # RPi.GPIO is only available on the Pi
+        import RPi.GPIO as gpio
+
+    gpio.setmode(gpio.BCM)
+    return ADC0834(cs=cs, clk=clk, dio=dio, gpio=gpio).setup()
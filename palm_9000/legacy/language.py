@@ -0,0 +1,61 @@
+"""
+Routes text to the Japanese (open_jtalk) or English (espeak) voice by Unicode
+script, in one regex pass, instead of running a statistical detector on every
+sentence. Kana and kanji (open_jtalk is the only voice that reads Han
+characters) go to Japanese, and all Latin text, accented or not, to espeak.
+Text without letters ("1.", "……。") has no language of its own and gets the
+caller's default, e.g. that of the sentence before it.
+"""
+
+import re
+
+# Hiragana, katakana (with phonetic extensions and the half-width forms), and
+# kanji (with 々〆〇).
+_KANA = "\u3040-\u30ff\u31f0-\u31ff\uff66-\uff9f"
+_KANJI = "\u3005-\u3007\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff"
+# ASCII and Latin-1/Extended-A/B letters (without × and ÷), and full-width
+# ASCII letters.
+_LATIN = "A-Za-z\u00c0-\u00d6\u00d8-\u00f6\u00f8-\u024f\uff21-\uff3a\uff41-\uff5a"
+
+_RUNS = re.compile(f"([{_KANA}{_KANJI}]+)|([{_LATIN}]+)")
+_JAPANESE_RUN = 1
+
+
+def detect_language(text: str, default: str = "ja") -> str:
+    """
+    Language code of `text`: "ja" if it has any kana or kanji, "en" if it has
+    Latin letters only, and `default` if it has no letters.
+    """
+    lang = default
+    for match in _RUNS.finditer(text):
+        if match.lastindex == _JAPANESE_RUN:
+            return "ja"
+        lang = "en"
+    return lang
+
+
+def split_by_language(text: str, default: str = "ja") -> list[tuple[str, str]]:
+    """
+    Split `text` into (language, segment) pairs to synthesize one after the
+    other. Text in a single script is one segment, in the language
+    `detect_language` gives it (`default` if it has no letters). Mixed text is
+    split into Japanese (kana and kanji) and Latin ("en") runs; digits, spaces
+    and punctuation stay with the run before them, or the first run if they
+    lead.
+
+        >>> split_by_language("今日はGood morningです。")
+        [('ja', '今日は'), ('en', 'Good morning'), ('ja', 'です。')]
+    """
+    segments: list[list] = []
+    for match in _RUNS.finditer(text):
+        lang = "ja" if match.lastindex == _JAPANESE_RUN else "en"
+        if segments and segments[-1][0] == lang:
+            continue
+        if segments:
+            segments[-1][2] = match.start()
+        segments.append([lang, match.start(), len(text)])
+
+    if len({lang for lang, _, _ in segments}) < 2:
+        return [(detect_language(text, default), text)]
+    segments[0][1] = 0
+    return [(lang, text[start:end]) for lang, start, end in segments]
@@ -1,6 +1,12 @@
 import re
+from collections.abc import Iterator
 
-from langchain_core.messages import HumanMessage, SystemMessage, trim_messages
+from langchain_core.messages import (
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+    trim_messages,
+)
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.prompts.chat import MessagesPlaceholder
 from langchain_google_genai import ChatGoogleGenerativeAI
@@ -41,6 +47,25 @@ def run_llm(state):
     return {**state, "messages": [new_message]}
 
 
+def stream_llm(messages: list[BaseMessage]) -> Iterator[str]:
+    """
+    Like `run_llm`, but yields the response text as it is generated so
+    speech synthesis can start on the first sentence.
+    """
+    trimmed_messages = trimmer.invoke(messages)
+    prompt = prompt_template.invoke({"messages": trimmed_messages})
+    for chunk in chat_model.stream(prompt):
+        if isinstance(chunk.content, str):
+            text = chunk.content
+        else:
+            text = "".join(
+                part if isinstance(part, str) else part.get("text", "")
+                for part in chunk.content
+            )
+        if text:
+            yield text
+
+
 def strip_thoughts(text: str) -> str:
     """
     Strips the <think>...</think> blocks from the text.
@@ -0,0 +1,343 @@
+import asyncio
+import functools
+import re
+import threading
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+
+import webrtcvad
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from pydantic import BaseModel
+
+from palm_9000.legacy.llm import stream_llm
+from palm_9000.legacy.response_cache import ResponseCache
+from palm_9000.legacy.speech_to_text import STT_SAMPLE_RATE, speech_to_text
+from palm_9000.legacy.text_to_speech import (
+    TextToSpeechResult,
+    text_to_speech_gemini_api,
+    text_to_speech_offline,
+)
+from palm_9000.legacy.vad import vad_pipeline
+from palm_9000.legacy.wake_word import wait_for_wake_word_sounddevice
+from palm_9000.settings import settings
+from palm_9000.utils import play_audio, wait_until_device_available
+
+# A sentence ends at Japanese or English end punctuation (a period only before
+# whitespace, so "3.5" isn't split) or a line break.
+_SENTENCE = re.compile(r".*?(?:[。！？!?\n]+|\.(?=\s))", re.DOTALL)
+
+
+class _ResponseEnd(BaseModel):
+    """
+    End of a response in the sentence and audio queues. With a `cache_key`,
+    the synthesize stage caches the response once it has rendered it all.
+    """
+
+    text: str = ""
+    cache_key: str | None = None
+
+
+def split_sentences(text: str) -> tuple[list[str], str]:
+    """
+    Split off the complete sentences at the start of `text`.
+    Returns the sentences and the unfinished remainder.
+    """
+    sentences, end = [], 0
+    for match in _SENTENCE.finditer(text):
+        if sentence := match.group().strip():
+            sentences.append(sentence)
+        end = match.end()
+    return sentences, text[end:]
+
+
+async def iterate_blocking(
+    iterable: Iterable, run: Callable[..., Awaitable]
+) -> AsyncIterator:
+    """
+    Iterate a blocking iterator (e.g. a generator reading the microphone)
+    without blocking the event loop; `run(func, *args)` runs each `next()`.
+    """
+    iterator = iter(iterable)
+    done = object()
+    while (item := await run(next, iterator, done)) is not done:
+        yield item
+
+
+def run_in_daemon_thread(func, *args) -> asyncio.Future:
+    """
+    Like `run_in_executor`, but on a daemon thread. The wake-word and
+    microphone loops only return on a detection, and executor threads would
+    keep the process alive after Ctrl+C.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def settle(result=None, error=None):
+        if future.done():
+            return
+        if error:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def target():
+        try:
+            result = func(*args)
+        except Exception as e:
+            callback = functools.partial(settle, error=e)
+        else:
+            callback = functools.partial(settle, result)
+        try:
+            loop.call_soon_threadsafe(callback)
+        except RuntimeError:
+            pass  # the loop is already closed
+
+    threading.Thread(target=target, daemon=True).start()
+    return future
+
+
+class LegacyPipeline:
+    """
+    Asyncio runner for the legacy wake word -> VAD -> STT -> LLM -> TTS loop.
+
+    Each stage is a task that reads from a bounded queue and runs its blocking
+    call on its own single-thread executor (a daemon thread for listening), so
+    the stages overlap instead of running one after another:
+
+    - listen: wake word, then utterances from `vad_pipeline` until silence
+    - transcribe: `speech_to_text`
+    - generate: `stream_llm`, split into sentences as tokens arrive
+    - synthesize: text to speech, one sentence at a time
+    - play: `play_audio`
+
+    The first sentence is spoken while the LLM is still writing the rest and
+    the next sentence is being synthesized. Utterances heard while (or just
+    after) the plant was talking are treated as echo and dropped.
+
+    With a `cache`, the first utterance after the wake word is looked up in it
+    first, and a hit is played straight from the cached audio without calling
+    the LLM or TTS. Later utterances depend on the conversation so far and
+    always go to the LLM; only first-utterance responses are cached.
+    """
+
+    def __init__(
+        self,
+        *,
+        device: int,
+        input_sample_rate: int,
+        vad_mode: int = 3,
+        silence_timeout: float = 1.0,
+        tts: Callable[[str], TextToSpeechResult] = text_to_speech_offline,
+        volume: float = 1.0,
+        max_history: int = 40,
+        echo_tail_secs: float = 0.8,
+        cache: ResponseCache | None = None,
+    ) -> None:
+        self.device = device
+        self.input_sample_rate = input_sample_rate
+        self.vad = webrtcvad.Vad(vad_mode)
+        self.silence_timeout = silence_timeout
+        self.tts = tts
+        self.volume = volume
+        self.max_history = max_history
+        self.echo_tail_secs = echo_tail_secs
+        self.cache = cache
+
+        self.history: list[BaseMessage] = []
+        # Items carry the monotonic time the user stopped talking, for latency,
+        # and utterances and transcripts whether they came first after the
+        # wake word.
+        self._utterances: asyncio.Queue[tuple[float, bytes, bool]] = asyncio.Queue(2)
+        self._transcripts: asyncio.Queue[tuple[float, str, bool]] = asyncio.Queue(2)
+        self._sentences: asyncio.Queue[
+            tuple[float, str | TextToSpeechResult | _ResponseEnd]
+        ] = asyncio.Queue(4)
+        self._audio: asyncio.Queue[tuple[float, TextToSpeechResult | _ResponseEnd]] = (
+            asyncio.Queue(2)
+        )
+        self._executors = {
+            name: ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+            for name in ("stt", "llm", "tts", "play")
+        }
+        self._speaking = False
+        self._spoke_until = 0.0
+
+    async def run(self) -> None:
+        """Run until the listener stops (e.g. Ctrl+C at the wake word)."""
+        workers = [
+            asyncio.create_task(self._transcribe()),
+            asyncio.create_task(self._generate()),
+            asyncio.create_task(self._synthesize()),
+            asyncio.create_task(self._play()),
+        ]
+        try:
+            await self._listen()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            for executor in self._executors.values():
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _in_executor(self, stage: str, func, *args):
+        if stage == "listen":
+            return await run_in_daemon_thread(func, *args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executors[stage], func, *args)
+
+    async def _listen(self) -> None:
+        while True:
+            print("🌴 Waiting for wake word...")
+            detected = await self._in_executor(
+                "listen",
+                wait_for_wake_word_sounddevice,
+                self.device,
+                self.input_sample_rate,
+            )
+            if not detected:
+                return
+            first = True
+            await self._in_executor(
+                "listen", wait_until_device_available, self.device, 5.0
+            )
+
+            with vad_pipeline(
+                self.vad,
+                device=self.device,
+                input_sample_rate=self.input_sample_rate,
+                vad_sample_rate=STT_SAMPLE_RATE,
+                frame_duration_ms=30,
+                padding_duration_ms=300,
+                silence_timeout=self.silence_timeout,
+            ) as utterances:
+                async for audio in iterate_blocking(
+                    utterances, functools.partial(self._in_executor, "listen")
+                ):
+                    ended_at = time.monotonic()
+                    if (
+                        self._speaking
+                        or ended_at - self._spoke_until < self.echo_tail_secs
+                    ):
+                        continue  # our own voice
+                    await self._utterances.put((ended_at, audio, first))
+                    first = False
+
+    async def _transcribe(self) -> None:
+        while True:
+            ended_at, audio, first = await self._utterances.get()
+            text = await self._in_executor("stt", speech_to_text, audio)
+            if text:
+                print(f"🎙️ {text}")
+                await self._transcripts.put((ended_at, text, first))
+
+    async def _generate(self) -> None:
+        while True:
+            ended_at, text, first = await self._transcripts.get()
+            cache_key = None
+            if self.cache is not None and first:
+                if cached := self.cache.get(text):
+                    print(f"🤖 (cached) {cached.text}")
+                    for audio in cached.audio:
+                        await self._sentences.put((ended_at, audio))
+                    await self._sentences.put((ended_at, _ResponseEnd()))
+                    self.history += [HumanMessage(text), AIMessage(cached.text)]
+                    del self.history[: -self.max_history]
+                    continue
+                cache_key = text
+
+            self.history.append(HumanMessage(text))
+            response, pending = [], ""
+            try:
+                async for chunk in iterate_blocking(
+                    stream_llm(self.history),
+                    functools.partial(self._in_executor, "llm"),
+                ):
+                    response.append(chunk)
+                    sentences, pending = split_sentences(pending + chunk)
+                    for sentence in sentences:
+                        await self._sentences.put((ended_at, sentence))
+                if pending.strip():
+                    await self._sentences.put((ended_at, pending.strip()))
+            except Exception as e:
+                print(f"LLM error: {e}")
+                cache_key = None  # don't cache a partial response
+            finally:
+                end = _ResponseEnd(text="".join(response))
+                if response and cache_key:
+                    end.cache_key = cache_key
+                await self._sentences.put((ended_at, end))
+
+            if response:
+                print(f"🤖 {''.join(response)}")
+                self.history.append(AIMessage("".join(response)))
+            else:
+                self.history.pop()  # don't leave an unanswered message behind
+            del self.history[: -self.max_history]
+
+    async def _synthesize(self) -> None:
+        rendered, complete = [], True
+        while True:
+            ended_at, item = await self._sentences.get()
+            if isinstance(item, _ResponseEnd):
+                if item.cache_key and rendered and complete:
+                    self.cache.put(item.cache_key, item.text, rendered)
+                rendered, complete = [], True
+                await self._audio.put((ended_at, item))
+                continue
+            if isinstance(item, TextToSpeechResult):
+                await self._audio.put((ended_at, item))  # cached audio
+                continue
+            try:
+                result = await self._in_executor("tts", self.tts, item)
+            except Exception as e:
+                print(f"TTS error: {e}")
+                complete = False
+                continue
+            rendered.append(result)
+            await self._audio.put((ended_at, result))
+
+    async def _play(self) -> None:
+        first = True
+        while True:
+            ended_at, result = await self._audio.get()
+            if isinstance(result, _ResponseEnd):
+                self._speaking = False
+                self._spoke_until = time.monotonic()
+                first = True
+                continue
+            if first:
+                print(f"🔊 First audio {time.monotonic() - ended_at:.2f}s after speech")
+                first = False
+            self._speaking = True
+            await self._in_executor(
+                "play", play_audio, result.audio_data, result.sample_rate, self.volume
+            )
+
+
+async def main():
+    tts = text_to_speech_gemini_api if settings.legacy_tts == "gemini" else None
+    pipeline = LegacyPipeline(
+        device=settings.input_device,
+        input_sample_rate=settings.sample_rate,
+        vad_mode=settings.vad_mode,
+        silence_timeout=settings.silence_timeout,
+        tts=tts or text_to_speech_offline,
+        cache=(
+            ResponseCache(
+                max_entries=settings.legacy_cache_max_entries,
+                ttl_secs=settings.legacy_cache_ttl_secs,
+                max_edits=settings.legacy_cache_max_edits,
+            )
+            if settings.legacy_response_cache
+            else None
+        ),
+    )
+    await pipeline.run()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("\nInterrupted by user. Exiting gracefully.")
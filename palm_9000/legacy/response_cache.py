@@ -0,0 +1,179 @@
+import collections
+import re
+import time
+import unicodedata
+
+from pydantic import BaseModel
+
+from palm_9000.legacy.text_to_speech import TextToSpeechResult
+from palm_9000.utils import remove_whitespace
+
+# Katakana -> hiragana, so "ゲンキ" and "げんき" match.
+_KATAKANA_TO_HIRAGANA = {code: code - 0x60 for code in range(0x30A1, 0x30F7)}
+
+# Runs of prolonged sound marks and wave dashes ("元気ー〜〜") count as one.
+_PROLONGED = re.compile(r"[ー〜~]+")
+
+
+def normalize(text: str) -> str:
+    """
+    Cache key for a transcript: NFKC (full-width letters and digits, half-width
+    kana), case folded, katakana as hiragana, and without whitespace,
+    punctuation or symbols.
+    """
+    text = unicodedata.normalize("NFKC", text).casefold()
+    text = text.translate(_KATAKANA_TO_HIRAGANA)
+    text = _PROLONGED.sub("ー", remove_whitespace(text))
+    return "".join(
+        char
+        for char in text
+        if char == "ー" or unicodedata.category(char)[0] not in "PS"
+    )
+
+
+def ngrams(key: str, n: int = 2) -> set[str]:
+    """Character n-grams of a normalized key, padded so short keys have some."""
+    padded = f"^{key}$"
+    return {padded[i : i + n] for i in range(len(padded) - n + 1)}
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Levenshtein distance between `a` and `b`, or `limit + 1` as soon as it
+    is known to exceed `limit`.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char in enumerate(a, 1):
+        current = [i]
+        for j, other in enumerate(b, 1):
+            current.append(
+                min(
+                    previous[j] + 1,
+                    current[j - 1] + 1,
+                    previous[j - 1] + (char != other),
+                )
+            )
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class CachedResponse(BaseModel):
+    text: str
+    audio: list[TextToSpeechResult]
+    created_at: float
+
+
+class ResponseCache:
+    """
+    Responses to recently heard utterances, with their rendered audio, so a
+    repeated question ("元気?", "are you thirsty?") skips both the LLM and the
+    TTS round trip.
+
+    Transcripts are looked up by their `normalize`d form. By default only the
+    same key hits: a similar question can have the opposite answer ("turn on
+    the light" / "turn off the light"). With `max_edits` > 0, a key at most
+    that many character edits away also hits, among the entries with a Dice
+    similarity of character bigrams of at least `min_similarity` (found
+    through an inverted index); the most similar wins. Entries expire after
+    `ttl_secs`, and the least recently used one is evicted beyond
+    `max_entries`.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 32,
+        ttl_secs: float = 24 * 3600,
+        max_edits: int = 0,
+        min_similarity: float = 0.8,
+        clock=time.monotonic,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_secs = ttl_secs
+        self.max_edits = max_edits
+        self.min_similarity = min_similarity
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries: collections.OrderedDict[str, CachedResponse] = (
+            collections.OrderedDict()
+        )
+        self._grams: dict[str, set[str]] = {}
+        self._index: collections.defaultdict[str, set[str]] = collections.defaultdict(
+            set
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, transcript: str) -> CachedResponse | None:
+        key = self._match(normalize(transcript))
+        if key is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return self._entries[key]
+
+    def put(self, transcript: str, text: str, audio: list[TextToSpeechResult]) -> None:
+        key = normalize(transcript)
+        if not key:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = CachedResponse(
+            text=text, audio=audio, created_at=self.clock()
+        )
+        self._grams[key] = grams = ngrams(key)
+        for gram in grams:
+            self._index[gram].add(key)
+        self._expire()
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._grams.clear()
+        self._index.clear()
+
+    def _match(self, key: str) -> str | None:
+        if not key:
+            return None
+        self._expire()
+        if key in self._entries:
+            return key
+        if self.max_edits <= 0:
+            return None
+
+        grams = ngrams(key)
+        shared: collections.Counter[str] = collections.Counter()
+        for gram in grams:
+            shared.update(self._index.get(gram, ()))
+        best, best_score = None, self.min_similarity
+        for candidate, count in shared.items():
+            score = 2 * count / (len(grams) + len(self._grams[candidate]))
+            if (
+                score >= best_score
+                and edit_distance(key, candidate, self.max_edits) <= self.max_edits
+            ):
+                best, best_score = candidate, score
+        return best
+
+    def _expire(self) -> None:
+        # Entries are in insertion order, but `get` moves hits to the end, so
+        # check them all; there are only `max_entries`.
+        deadline = self.clock() - self.ttl_secs
+        for key in [k for k, e in self._entries.items() if e.created_at < deadline]:
+            self._remove(key)
+
+    def _remove(self, key: str) -> None:
+        del self._entries[key]
+        for gram in self._grams.pop(key):
+            keys = self._index[gram]
+            keys.discard(key)
+            if not keys:
+                del self._index[gram]
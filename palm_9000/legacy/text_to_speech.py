@@ -4,10 +4,13 @@ import subprocess
 from google import genai
 from google.genai import types
 from pydantic import BaseModel
-import langdetect
+import numpy as np
 import scipy.io.wavfile
 
+from palm_9000 import dsp
+from palm_9000.legacy.language import split_by_language
 from palm_9000.settings import settings
+from palm_9000.utils import resample
 
 
 class TextToSpeechResult(BaseModel):
@@ -54,12 +57,41 @@ def text_to_speech_gemini_api(text: str) -> TextToSpeechResult:
     return TextToSpeechResult(audio_data=result, sample_rate=24000)
 
 
+# Language of the last sentence spoken offline, for the next one if it has no
+# letters. Replies are synthesized one sentence at a time, in order.
+_last_language = "ja"
+
+
 def text_to_speech_offline(text: str) -> TextToSpeechResult:
-    lang = langdetect.detect(text)
+    """
+    Speaks Japanese with open_jtalk and any Latin text with espeak. Mixed replies
+    ("今日はGood morningです") are split by script, each part is synthesized
+    by its own engine, and the parts are joined at the first part's sample
+    rate. Sentences without letters ("1.", "……。") are read in the language
+    of the sentence before them.
+    """
+    global _last_language
+
+    segments = split_by_language(text, default=_last_language)
+    _last_language = segments[-1][0]
+
+    sample_rate, pcm = None, []
+    for lang, segment in segments:
+        rate, audio_data = _synthesize_offline(lang, segment)
+        if sample_rate is None:
+            sample_rate = rate
+        elif rate != sample_rate:
+            resampled = resample(audio_data, rate, sample_rate)
+            audio_data = dsp.to_int16(
+                resampled, np.empty(resampled.size, np.int16), scale=1.0
+            )
+        pcm.append(audio_data)
+    return TextToSpeechResult(
+        audio_data=np.concatenate(pcm).tobytes(), sample_rate=sample_rate
+    )
 
-    if lang not in ["ja", "en"]:
-        raise NotImplementedError(f"Language '{lang}' not supported.")
 
+def _synthesize_offline(lang: str, text: str) -> tuple[int, np.ndarray]:
     with (
         tempfile.NamedTemporaryFile("w+", encoding="utf-8", suffix=".txt") as txt_file,
         tempfile.NamedTemporaryFile(suffix=".wav") as wav_file,
@@ -88,7 +120,4 @@ def text_to_speech_offline(text: str) -> TextToSpeechResult:
             # sudo apt install espeak
             subprocess.run(["espeak", "-w", wav_file.name, text], check=True)
 
-        sample_rate, audio_data = scipy.io.wavfile.read(wav_file.name)
-        return TextToSpeechResult(
-            audio_data=audio_data.tobytes(), sample_rate=sample_rate
-        )
+        return scipy.io.wavfile.read(wav_file.name)
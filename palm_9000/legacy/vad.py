@@ -1,13 +1,19 @@
 import collections
 import contextlib
 import time
-from collections.abc import Iterable
+from collections.abc import Callable, Iterable, Iterator
+from typing import TYPE_CHECKING
 
 import numpy as np
-import sounddevice as sd
-import webrtcvad
 
-from palm_9000.utils import resample
+from palm_9000 import dsp
+
+# sounddevice, webrtcvad and scipy (through utils) are only installed with the
+# dev group. Import them where they're used, so the live pipeline can use the
+# frame-level helpers (`FrameVad`, `PrerollBuffer`) with just the main ones.
+if TYPE_CHECKING:
+    import sounddevice as sd
+    import webrtcvad
 
 
 class Frame:
@@ -32,7 +38,7 @@ class Frame:
 
 
 def frame_generator(
-    stream: sd.InputStream, *, frame_duration_ms: int
+    stream: "sd.InputStream", *, frame_duration_ms: int
 ) -> Iterable[Frame]:
     """
     Generate audio frames from an open stream.
@@ -55,13 +61,18 @@ def resample_frames(
     A generator that wraps an audio frame generator and resamples
     the audio frames.
     """
+    from palm_9000.utils import resample
+
+    workspace = dsp.Workspace()
     for frame in frames:
         audio = np.frombuffer(frame.bytes, dtype=np.int16)
         resampled_audio = resample(audio, original_sample_rate, target_sample_rate)
         # We are changing the sample rate, not the bit-depth.
-        # Therefore we can keep the same dtype.
-        resampled_audio = np.clip(resampled_audio, -32768, 32767).astype(np.int16)
-        yield Frame(resampled_audio.tobytes(), frame.timestamp, frame.duration)
+        # Therefore we can keep the same dtype (rounding in place and reusing
+        # one int16 buffer across frames).
+        pcm = workspace.get(resampled_audio.size, np.int16)
+        dsp.to_int16(resampled_audio, pcm, scale=1.0)
+        yield Frame(pcm.tobytes(), frame.timestamp, frame.duration)
 
 
 def vad_collector(
@@ -69,16 +80,18 @@ def vad_collector(
     sample_rate: int,
     frame_duration_ms: int,
     padding_duration_ms: int,
-    vad: webrtcvad.Vad,
+    vad: "webrtcvad.Vad",
     frames: Iterable[Frame],
     silence_timeout: float = 2.0,  # Optional: silence timeout in seconds
     verbose: bool = False,
+    clock: Callable[[], float] = time.time,
 ) -> Iterable[bytes]:
     """
     Implementation taken from the example in the py-webrtcvad
     https://github.com/wiseman/py-webrtcvad/blob/master/example.py
 
-    Altered to including a silence timeout feature.
+    Altered to including a silence timeout feature. The timeout is measured
+    with `clock`; pass the stream time to run faster than real time.
     """
     num_padding_frames = int(padding_duration_ms / frame_duration_ms)
     # We use a deque for our sliding window/ring buffer.
@@ -115,7 +128,7 @@ def vad_collector(
                     voiced_frames.append(f)
                 ring_buffer.clear()
             # While we're in the NONTRIGGERED state, we want to check for silence timeout.
-            elif silence_start and time.time() - silence_start > silence_timeout:
+            elif silence_start and clock() - silence_start > silence_timeout:
                 log("Silence timeout. Stop recording.")
                 break
         else:
@@ -136,7 +149,7 @@ def vad_collector(
                 # When we enter the NOTTRIGGERED state, we want to start the silence timer.
                 if silence_start is None:
                     log("Silence detected, starting silence timer.")
-                    silence_start = time.time()
+                    silence_start = clock()
             else:
                 # If we're still in the TRIGGERED state, reset the
                 # silence start time.
@@ -150,9 +163,148 @@ def vad_collector(
         yield b"".join([f.bytes for f in voiced_frames])
 
 
+class SpeechTrigger:
+    """
+    Push-based version of the TRIGGERED / NOTTRIGGERED state machine in
+    `vad_collector`, for callers that receive frames one at a time (e.g. a
+    pipecat processor) instead of iterating over a generator.
+
+    Feed it one `is_speech` decision per frame; `update` returns the new state.
+    """
+
+    def __init__(self, *, frame_duration_ms: int, padding_duration_ms: int) -> None:
+        num_padding_frames = max(1, int(padding_duration_ms / frame_duration_ms))
+        self.ring_buffer = collections.deque(maxlen=num_padding_frames)
+        self.triggered = False
+
+    def update(self, is_speech: bool) -> bool:
+        self.ring_buffer.append(is_speech)
+        if not self.triggered:
+            num_voiced = sum(self.ring_buffer)
+            if num_voiced > 0.9 * self.ring_buffer.maxlen:
+                self.triggered = True
+                self.ring_buffer.clear()
+        else:
+            num_unvoiced = len(self.ring_buffer) - sum(self.ring_buffer)
+            if num_unvoiced > 0.9 * self.ring_buffer.maxlen:
+                self.triggered = False
+                self.ring_buffer.clear()
+        return self.triggered
+
+    def reset(self) -> None:
+        self.ring_buffer.clear()
+        self.triggered = False
+
+
+class FrameVad:
+    """
+    webrtcvad for audio that arrives in blocks of any length (e.g. pipecat
+    `InputAudioRawFrame`s): buffers 16-bit mono audio, re-chunks it into
+    `frame_duration_ms` frames (webrtcvad only accepts 10/20/30 ms), and feeds
+    each decision to a `SpeechTrigger` if `padding_duration_ms` is given.
+    """
+
+    def __init__(
+        self,
+        *,
+        mode: int = 3,
+        frame_duration_ms: int = 20,
+        padding_duration_ms: int | None = None,
+    ) -> None:
+        import webrtcvad
+
+        self.frame_duration_ms = frame_duration_ms
+        self.trigger = (
+            SpeechTrigger(
+                frame_duration_ms=frame_duration_ms,
+                padding_duration_ms=padding_duration_ms,
+            )
+            if padding_duration_ms
+            else None
+        )
+        self._vad = webrtcvad.Vad(mode)
+        self._buffer = bytearray()
+
+    @property
+    def triggered(self) -> bool:
+        return bool(self.trigger and self.trigger.triggered)
+
+    def frames(self, audio: bytes, sample_rate: int) -> Iterator[tuple[bytes, bool]]:
+        """
+        Add `audio` to the buffer and yield (frame, is_speech) for every whole
+        frame in it. Leftover audio waits for the next call.
+        """
+        frame_size = int(sample_rate * self.frame_duration_ms / 1000) * 2
+        self._buffer.extend(audio)
+        while len(self._buffer) >= frame_size:
+            frame = bytes(self._buffer[:frame_size])
+            del self._buffer[:frame_size]
+            is_speech = self._vad.is_speech(frame, sample_rate)
+            if self.trigger:
+                self.trigger.update(is_speech)
+            yield frame, is_speech
+
+    def is_speech(self, audio: bytes, sample_rate: int) -> bool:
+        """
+        Whether any whole frame in `audio` (plus what was buffered) is speech.
+        """
+        speech = False
+        for _, is_speech in self.frames(audio, sample_rate):
+            speech = speech or is_speech
+        return speech
+
+    def clear(self) -> None:
+        """Drop buffered audio that hasn't made up a whole frame yet."""
+        self._buffer.clear()
+
+
+class PrerollBuffer:
+    """
+    The most recent audio frames (anything with `audio`, `sample_rate` and
+    `num_channels`, e.g. pipecat's `InputAudioRawFrame`), replayed when a turn
+    starts so its first syllable isn't clipped. Holds about `secs` of audio,
+    and always at least the newest frame.
+    """
+
+    def __init__(self, secs: float) -> None:
+        self.secs = secs
+        self.bytes = 0
+        self._frames = collections.deque()
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def append(self, frame, secs: float | None = None) -> int:
+        """
+        Add `frame` and drop the oldest frames beyond `secs` (`self.secs` by
+        default). Returns the number of bytes dropped.
+        """
+        self._frames.append(frame)
+        self.bytes += len(frame.audio)
+        if secs is None:
+            secs = self.secs
+        limit = int(frame.sample_rate * frame.num_channels * 2 * secs)
+        dropped = 0
+        while self.bytes > limit and len(self._frames) > 1:
+            size = len(self._frames.popleft().audio)
+            self.bytes -= size
+            dropped += size
+        return dropped
+
+    def drain(self) -> Iterator:
+        """
+        Yield and remove the buffered frames, oldest first, including any
+        appended while the caller is busy with one.
+        """
+        while self._frames:
+            frame = self._frames.popleft()
+            self.bytes -= len(frame.audio)
+            yield frame
+
+
 @contextlib.contextmanager
 def vad_pipeline(
-    vad: webrtcvad.Vad,
+    vad: "webrtcvad.Vad",
     *,
     device: int,
     input_sample_rate: int,
@@ -171,6 +323,8 @@ def vad_pipeline(
         for voiced_audio in generator:
             process_voiced_audio(voiced_audio)
     """
+    import sounddevice as sd
+
     frame_size = int(input_sample_rate * (frame_duration_ms / 1000.0))
     stream = sd.InputStream(
         samplerate=input_sample_rate,
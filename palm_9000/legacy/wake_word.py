@@ -3,10 +3,25 @@ import numpy as np
 import pvporcupine
 import sounddevice as sd
 
-from palm_9000.vad import resample
+from palm_9000 import dsp
+from palm_9000.utils import resample
 from palm_9000.settings import settings
 
 
+def create_porcupine(sensitivity: float = 0.5) -> pvporcupine.Porcupine:
+    """
+    Create a Porcupine instance for the configured keyword.
+    Higher sensitivity (0..1) misses fewer wake words but accepts more noise.
+    The caller owns it and must call `delete()` when done.
+    """
+    return pvporcupine.create(
+        access_key=settings.picovoice_access_key.get_secret_value(),
+        keyword_paths=[settings.porcupine_keyword_path],
+        model_path=settings.porcupine_model_path,
+        sensitivities=[sensitivity],
+    )
+
+
 def wait_for_wake_word_sounddevice(device: int, input_rate: int):
     """
     Waits for the wake word using Porcupine and sounddevice.
@@ -28,11 +43,7 @@ def wait_for_wake_word_sounddevice(device: int, input_rate: int):
     'Porcupine',
     'Terminator',
     """
-    porcupine = pvporcupine.create(
-        access_key=settings.picovoice_access_key.get_secret_value(),
-        keyword_paths=[settings.porcupine_keyword_path],
-        model_path=settings.porcupine_model_path,
-    )
+    porcupine = create_porcupine()
 
     frame_length = porcupine.frame_length  # usually 512
     target_rate = porcupine.sample_rate  # 16000 Hz
@@ -42,6 +53,7 @@ def wait_for_wake_word_sounddevice(device: int, input_rate: int):
     # ceil(512 / (16000/44100)) = 1412
     input_samples_per_frame = int(np.ceil(frame_length / resample_ratio))
     buffer = np.zeros(0, dtype=np.int16)
+    pcm = np.empty(frame_length, dtype=np.int16)
 
     print("Listening for wake word... (Press Ctrl+C to exit)")
 
@@ -66,9 +78,7 @@ def wait_for_wake_word_sounddevice(device: int, input_rate: int):
                     if len(resampled) < frame_length:
                         continue
 
-                    pcm = np.clip(resampled[:frame_length], -32768, 32767).astype(
-                        np.int16
-                    )
+                    dsp.to_int16(resampled[:frame_length], pcm, scale=1.0)
 
                     result = porcupine.process(pcm)
                     if result >= 0:
@@ -84,11 +94,7 @@ def wait_for_wake_word_sounddevice(device: int, input_rate: int):
 
 
 def wait_for_wake_word_pvrecorder():
-    porcupine = pvporcupine.create(
-        access_key=settings.picovoice_access_key.get_secret_value(),
-        keyword_paths=[settings.porcupine_keyword_path],
-        model_path=settings.porcupine_model_path,
-    )
+    porcupine = create_porcupine()
 
     recorder = PvRecorder(
         device_index=-1,  # Use default input device
@@ -0,0 +1,225 @@
+import asyncio
+import sqlite3
+import threading
+import time
+import uuid
+from collections.abc import Callable
+
+from loguru import logger
+from pipecat.frames.frames import (
+    LLMFullResponseEndFrame,
+    LLMTextFrame,
+    TranscriptionFrame,
+)
+from pipecat.observers.base_observer import BaseObserver, FramePushed
+from pipecat.services.llm_service import LLMService
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS turns (
+    id INTEGER PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    ts REAL NOT NULL,
+    role TEXT NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS turns_session_ts ON turns (session_id, ts);
+CREATE INDEX IF NOT EXISTS turns_ts ON turns (ts);
+CREATE TABLE IF NOT EXISTS summaries (
+    id INTEGER PRIMARY KEY,
+    ts_from REAL NOT NULL,
+    ts_to REAL NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS context (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    updated REAL NOT NULL,
+    text TEXT NOT NULL
+);
+"""
+
+ROLE_NAMES = {"user": "User", "assistant": "PALM-9000"}
+
+
+def extractive_summary(lines: list[str], max_chars: int = 400) -> str:
+    """
+    Cheap default summarizer: keep the start of every line until the budget is
+    spent. Good enough to remind the model what was talked about.
+    """
+    per_line = max(max_chars // max(len(lines), 1), 40)
+    parts = []
+    for line in lines:
+        parts.append(line if len(line) <= per_line else line[: per_line - 1] + "…")
+    return " / ".join(parts)[:max_chars]
+
+
+class ConversationStore:
+    """
+    Persistent conversation memory in a single SQLite file.
+
+    Keeps the most recent `max_turns` turns verbatim. Once `fold_turns` more
+    have piled up, the oldest ones are folded into a short summary, and once
+    there are more than `max_summaries` summaries the oldest two are folded
+    into one. The file therefore stays small no matter how long the plant has
+    been running.
+
+    After every write the prompt text is rebuilt and stored in a one-row
+    `context` table, so `context_text()` at startup is a single primary-key
+    lookup instead of a replay of the history.
+
+    Writes are batched (one transaction per bot turn) and the database runs in
+    WAL mode with `synchronous=NORMAL` to keep SD-card writes down.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        max_turns: int = 20,
+        fold_turns: int = 10,
+        max_summaries: int = 5,
+        summary_chars: int = 400,
+        summarizer: Callable[[list[str], int], str] = extractive_summary,
+    ) -> None:
+        self.path = path
+        self.max_turns = max_turns
+        self.fold_turns = fold_turns
+        self.max_summaries = max_summaries
+        self.summary_chars = summary_chars
+        self.summarizer = summarizer
+
+        self._lock = threading.Lock()
+        # Written from a worker thread (see `ConversationMemoryObserver`).
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def context_text(self) -> str:
+        with self._lock:
+            row = self._conn.execute("SELECT text FROM context WHERE id = 0").fetchone()
+        return row[0] if row else ""
+
+    def recent_turns(self, session_id: str | None = None) -> list[tuple[str, str]]:
+        """
+        Return `(role, text)` for the verbatim window, oldest first.
+        """
+        query = "SELECT role, text FROM turns"
+        args: tuple = ()
+        if session_id:
+            query += " WHERE session_id = ?"
+            args = (session_id,)
+        with self._lock:
+            return self._conn.execute(query + " ORDER BY ts", args).fetchall()
+
+    def add_turns(self, session_id: str, turns: list[tuple[float, str, str]]) -> None:
+        """
+        Store `(timestamp, role, text)` turns in one transaction and refresh the
+        prebuilt context.
+        """
+        if not turns:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO turns (session_id, ts, role, text) VALUES (?, ?, ?, ?)",
+                [(session_id, ts, role, text) for ts, role, text in turns],
+            )
+            self._fold()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO context (id, updated, text) VALUES (0, ?, ?)",
+                (time.time(), self._build_context()),
+            )
+
+    def _fold(self) -> None:
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM turns").fetchone()
+        if count <= self.max_turns + self.fold_turns:
+            return
+
+        rows = self._conn.execute(
+            "SELECT id, ts, role, text FROM turns ORDER BY ts LIMIT ?",
+            (count - self.max_turns,),
+        ).fetchall()
+        lines = [f"{ROLE_NAMES.get(role, role)}: {text}" for _, _, role, text in rows]
+        self._conn.execute(
+            "INSERT INTO summaries (ts_from, ts_to, text) VALUES (?, ?, ?)",
+            (rows[0][1], rows[-1][1], self.summarizer(lines, self.summary_chars)),
+        )
+        self._conn.execute("DELETE FROM turns WHERE id <= ?", (rows[-1][0],))
+
+        summaries = self._conn.execute(
+            "SELECT id, ts_from, ts_to, text FROM summaries ORDER BY ts_from"
+        ).fetchall()
+        if len(summaries) > self.max_summaries:
+            (id_a, ts_from, _, a), (id_b, _, ts_to, b) = summaries[:2]
+            self._conn.execute(
+                "UPDATE summaries SET ts_from = ?, ts_to = ?, text = ? WHERE id = ?",
+                (ts_from, ts_to, self.summarizer([a, b], self.summary_chars), id_b),
+            )
+            self._conn.execute("DELETE FROM summaries WHERE id = ?", (id_a,))
+
+    def _build_context(self) -> str:
+        summaries = [
+            text
+            for (text,) in self._conn.execute(
+                "SELECT text FROM summaries ORDER BY ts_from"
+            )
+        ]
+        turns = self._conn.execute("SELECT role, text FROM turns ORDER BY ts")
+        lines = [f"{ROLE_NAMES.get(role, role)}: {text}" for role, text in turns]
+
+        parts = []
+        if summaries:
+            parts.append("Earlier conversations, summarized:")
+            parts.extend(f"- {s}" for s in summaries)
+        if lines:
+            parts.append("Most recent conversation:")
+            parts.extend(lines)
+        return "\n".join(parts)
+
+
+class ConversationMemoryObserver(BaseObserver):
+    """
+    Records what the user said and what the bot answered into a
+    `ConversationStore`, without adding a processor to the pipeline.
+
+    Gemini Live pushes user transcriptions upstream and its own transcript
+    downstream as `LLMTextFrame`s, so both are picked up where they leave the
+    LLM service. A turn is written when the response ends.
+    """
+
+    def __init__(self, store: ConversationStore, session_id: str | None = None):
+        super().__init__()
+        self.store = store
+        self.session_id = session_id or uuid.uuid4().hex
+        self._pending: list[tuple[float, str, str]] = []
+        self._bot_text: list[str] = []
+
+    async def on_push_frame(self, data: FramePushed):
+        if not isinstance(data.source, LLMService):
+            return
+        frame = data.frame
+        if isinstance(frame, TranscriptionFrame):
+            if frame.text.strip():
+                self._pending.append((time.time(), "user", frame.text.strip()))
+        elif isinstance(frame, LLMTextFrame):
+            self._bot_text.append(frame.text)
+        elif isinstance(frame, LLMFullResponseEndFrame):
+            await self.flush()
+
+    async def flush(self) -> None:
+        text = "".join(self._bot_text).strip()
+        if text:
+            # Stamped at the end of the response: the user transcription can
+            # arrive after the bot has started talking.
+            self._pending.append((time.time(), "assistant", text))
+        self._bot_text = []
+        turns, self._pending = self._pending, []
+        if not turns:
+            return
+        try:
+            await asyncio.to_thread(self.store.add_turns, self.session_id, turns)
+        except sqlite3.Error as e:
+            logger.error(f"Failed to save conversation turns: {e}")
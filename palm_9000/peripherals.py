@@ -0,0 +1,287 @@
+import asyncio
+import multiprocessing as mp
+import os
+import statistics
+import sys
+import threading
+import time
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+from loguru import logger
+from pydantic import BaseModel
+
+from palm_9000 import dsp
+from palm_9000.gpio import (
+    Max7219AmplitudeHeart,
+    Max7219Spectrum,
+    SpectrumAnalyzer,
+    audio_level,
+)
+from palm_9000.hardware import create_adc0834, create_display_serial
+from palm_9000.scheduling import pin_to_cpus
+
+# Shared record layouts (float64 slots).
+_AUDIO_SLOTS = 1 + 8  # heart level, then spectrum band levels
+_SENSOR_SLOTS = 2  # moisture reading (raw 0..255), number of samples taken
+
+
+class SharedRecord:
+    """
+    A fixed-size float64 record in shared memory, for one writer process and
+    any number of readers, with a write counter (`version`).
+
+    Reads and writes copy the record under a `multiprocessing.Lock`. A
+    lock-free seqlock would need memory barriers between the counter and
+    payload accesses, which numpy can't issue, and without them a reader on a
+    weakly ordered CPU (the Pi's Cortex-A53) can accept a torn record. The
+    lock is a futex, so uncontended it costs no syscall, and it's only held
+    for a copy of a few floats.
+    """
+
+    def __init__(self, buf: memoryview, offset: int, slots: int, lock) -> None:
+        self._lock = lock
+        self._seq = np.ndarray((1,), dtype=np.uint64, buffer=buf, offset=offset)
+        self._values = np.ndarray(
+            (slots,), dtype=np.float64, buffer=buf, offset=offset + 8
+        )
+        self._copy = np.empty(slots, dtype=np.float64)
+
+    @staticmethod
+    def nbytes(slots: int) -> int:
+        return 8 + 8 * slots
+
+    @property
+    def version(self) -> int:
+        with self._lock:
+            return int(self._seq[0])
+
+    def write(self, values) -> None:
+        with self._lock:
+            self._values[:] = values
+            self._seq[0] += 1
+
+    def read(self) -> np.ndarray:
+        """Return a consistent copy of the values (reused between calls)."""
+        with self._lock:
+            np.copyto(self._copy, self._values)
+        return self._copy
+
+    def release(self) -> None:
+        # Views into the shared memory must go before it can be closed.
+        del self._seq, self._values
+
+
+class _SharedBlock:
+    """
+    The shared memory block: audio levels (main -> peripherals) and sensor
+    readings (peripherals -> main), each its own single-writer record with
+    its own lock, from `locks()` in the parent and passed on to the child.
+    """
+
+    SIZE = SharedRecord.nbytes(_AUDIO_SLOTS) + SharedRecord.nbytes(_SENSOR_SLOTS)
+
+    @staticmethod
+    def locks(ctx) -> tuple:
+        return ctx.Lock(), ctx.Lock()
+
+    def __init__(self, locks: tuple, name: str | None = None) -> None:
+        if name is None:
+            self.shm = SharedMemory(create=True, size=self.SIZE)
+            self.shm.buf[: self.SIZE] = bytes(self.SIZE)
+        else:
+            # Spawned children share the parent's resource tracker, which
+            # already knows the block; the parent unlinks it.
+            self.shm = SharedMemory(name=name)
+        audio_lock, sensor_lock = locks
+        self.audio = SharedRecord(self.shm.buf, 0, _AUDIO_SLOTS, audio_lock)
+        self.sensor = SharedRecord(
+            self.shm.buf, SharedRecord.nbytes(_AUDIO_SLOTS), _SENSOR_SLOTS, sensor_lock
+        )
+
+    def close(self, unlink: bool = False) -> None:
+        self.audio.release()
+        self.sensor.release()
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+class PeripheralConfig(BaseModel):
+    heart_mode: str = "amplitude"
+    hardware_backend: str = "pi"
+    sample_rate: int = 24000
+    fps: int = 60
+    cpus: str = ""
+    moisture_sensor: bool = False
+    moisture_adc_cs: int = 26
+    moisture_adc_clk: int = 19
+    moisture_adc_dio: int = 21
+    moisture_adc_channel: int = 0
+    moisture_interval_secs: float = 5.0
+    moisture_samples_per_read: int = 5
+
+
+class PeripheralProcess:
+    """
+    Runs the MAX7219 display and the moisture-sensor sampling in a child
+    process, so their rendering and the ADC bit-banging (which sleeps between
+    clock edges) don't compete with the audio pipeline for the GIL. Pin each
+    process to its own core with `cpus` / `pin_to_cpus`.
+
+    It stands in for the heart: `start()`, `stop()` and `process_audio()`
+    work the same, but `process_audio` only computes the level (and the band
+    levels in spectrum mode) and publishes them through shared memory. It also
+    stands in for the ADC: `read()` returns the latest moisture sample taken
+    by the child, so it can be passed to `SoilMoistureSensor`.
+    """
+
+    def __init__(self, config: PeripheralConfig) -> None:
+        self.config = config
+        # A fresh interpreter rather than a fork of the threaded parent. It
+        # re-imports `__main__`, which is why main.py only imports the
+        # pipeline inside `main()`.
+        self._ctx = mp.get_context("spawn")
+        self._stop_event = self._ctx.Event()
+        self._locks = _SharedBlock.locks(self._ctx)
+        self._process: mp.process.BaseProcess | None = None
+        self._block: _SharedBlock | None = None
+        self._analyzer = (
+            SpectrumAnalyzer(sample_rate=config.sample_rate)
+            if config.heart_mode == "spectrum"
+            else None
+        )
+        self._values = np.zeros(_AUDIO_SLOTS, dtype=np.float64)
+        self._workspace = dsp.Workspace()
+
+    async def start(self) -> None:
+        if self._process:
+            return
+        self._block = _SharedBlock(self._locks)
+        self._stop_event.clear()
+        self._process = self._ctx.Process(
+            target=_peripheral_main,
+            args=(self.config, self._block.shm.name, self._locks, self._stop_event),
+            name="palm-9000-peripherals",
+            daemon=True,
+        )
+        self._process.start()
+        logger.info(f"Started peripheral process (pid {self._process.pid})")
+
+    async def stop(self) -> None:
+        if not self._process:
+            return
+        self._stop_event.set()
+        await asyncio.to_thread(self._process.join, 2.0)
+        if self._process.is_alive():
+            self._process.terminate()
+        self._process = None
+        self._block.close(unlink=True)
+        self._block = None
+
+    def process_audio(self, audio_bytes: bytes) -> None:
+        """
+        Feed audio bytes (int16 mono). Call from one thread only.
+        """
+        if not self._block:
+            return
+        self._values[0] = audio_level(audio_bytes, workspace=self._workspace)
+        if self._analyzer:
+            if audio_bytes:
+                self._values[1:] = self._analyzer.update(audio_bytes)
+            else:
+                self._analyzer.reset()
+                self._values[1:] = 0.0
+        self._block.audio.write(self._values)
+
+    def read(self, channel: int = 0, timeout: float = 10.0) -> int:
+        """
+        Latest moisture reading from the child. Blocks until the first one
+        arrives, so call it off the event loop (`SoilMoistureSensor` does).
+        """
+        if channel != self.config.moisture_adc_channel:
+            raise ValueError(f"Channel {channel} is not sampled")
+        deadline = time.monotonic() + timeout
+        while self._block:
+            value, samples = self._block.sensor.read()
+            if samples:
+                return int(value)
+            if time.monotonic() > deadline:
+                break
+            time.sleep(0.05)
+        raise TimeoutError("No moisture reading from the peripheral process")
+
+
+def _peripheral_main(
+    config: PeripheralConfig, shm_name: str, locks: tuple, stop_event
+) -> None:
+    """Entry point of the peripheral process."""
+    if "pipecat" in sys.modules:
+        logger.warning(
+            "pipecat was imported into the peripheral process; keep the "
+            "top-level imports of the __main__ module light"
+        )
+    pin_to_cpus(config.cpus, "peripheral process")
+    block = _SharedBlock(locks, shm_name)
+    try:
+        asyncio.run(_run_peripherals(config, block, stop_event))
+    except KeyboardInterrupt:
+        pass  # the parent handles Ctrl-C and stops us
+    finally:
+        block.close()
+
+
+async def _run_peripherals(config: PeripheralConfig, block: _SharedBlock, stop_event):
+    parent = os.getppid()
+    serial = create_display_serial(config.hardware_backend)
+    if config.heart_mode == "spectrum":
+        heart = Max7219Spectrum(fps=config.fps, serial=serial)
+    else:
+        heart = Max7219AmplitudeHeart(fps=config.fps, min_brightness=0, serial=serial)
+    await heart.start()
+
+    stop = threading.Event()
+    sampler = None
+    if config.moisture_sensor:
+        sampler = threading.Thread(
+            target=_sample_moisture, args=(config, block, stop), daemon=True
+        )
+        sampler.start()
+
+    period = 1.0 / config.fps
+    try:
+        while not stop_event.is_set() and os.getppid() == parent:
+            values = block.audio.read()
+            if config.heart_mode == "spectrum":
+                heart.set_bands(values[1:])
+            else:
+                heart.set_level(values[0])
+            await asyncio.sleep(period)
+    finally:
+        stop.set()
+        await heart.stop()
+        if sampler:
+            sampler.join(timeout=1.0)
+
+
+def _sample_moisture(config: PeripheralConfig, block: _SharedBlock, stop) -> None:
+    adc = create_adc0834(
+        config.hardware_backend,
+        cs=config.moisture_adc_cs,
+        clk=config.moisture_adc_clk,
+        dio=config.moisture_adc_dio,
+        sim_values={config.moisture_adc_channel: 128},
+    )
+    samples = 0
+    while not stop.is_set():
+        try:
+            values = [
+                adc.read(config.moisture_adc_channel)
+                for _ in range(config.moisture_samples_per_read)
+            ]
+        except Exception as e:
+            logger.error(f"Moisture sensor read failed: {e}")
+        else:
+            samples += 1
+            block.sensor.write((statistics.median(values), samples))
+        stop.wait(config.moisture_interval_secs)
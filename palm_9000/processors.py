@@ -1,24 +1,48 @@
+import collections
+import time
+from typing import TYPE_CHECKING
+
+import numpy as np
+from loguru import logger
 from pipecat.frames.frames import (
+    BotInterruptionFrame,
     BotStartedSpeakingFrame,
     BotStoppedSpeakingFrame,
     CancelFrame,
     EndFrame,
     ErrorFrame,
     Frame,
+    InputAudioRawFrame,
+    LLMFullResponseEndFrame,
+    LLMFullResponseStartFrame,
+    StartInterruptionFrame,
+    TTSAudioRawFrame,
+    TTSStartedFrame,
 )
 from pipecat.processors.audio.audio_buffer_processor import AudioBufferProcessor
 from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
 
+from palm_9000 import dsp
+from palm_9000.legacy.vad import FrameVad, PrerollBuffer
+
+if TYPE_CHECKING:
+    from palm_9000.gpio import Max7219AmplitudeHeart
+
 
 class AudioRecordingControlProcessor(FrameProcessor):
     """
     Starts/stops AudioBufferProcessor recording based on bot speaking frames
-    and stops the heart display on cancel/end/error.
+    and stops the heart display on interruption/cancel/end/error.
     """
 
-    def __init__(self, audio_buffer: AudioBufferProcessor) -> None:
+    def __init__(
+        self,
+        audio_buffer: AudioBufferProcessor,
+        heart: "Max7219AmplitudeHeart | None" = None,
+    ) -> None:
         super().__init__()
         self._audio_buffer = audio_buffer
+        self._heart = heart
 
     async def process_frame(self, frame: Frame, direction: FrameDirection):
         await super().process_frame(frame, direction)
@@ -27,5 +51,268 @@ class AudioRecordingControlProcessor(FrameProcessor):
             await self._audio_buffer.start_recording()
         elif isinstance(frame, (BotStoppedSpeakingFrame, CancelFrame, EndFrame, ErrorFrame)):
             await self._audio_buffer.stop_recording()
+        elif isinstance(frame, StartInterruptionFrame):
+            await self._audio_buffer.stop_recording()
+            if self._heart:
+                # Drop the level now instead of letting the last buffer linger.
+                self._heart.process_audio(b"")
+
+        await self.push_frame(frame, direction)
+
+
+class InputAudioGateProcessor(FrameProcessor):
+    """
+    Holds back microphone audio until someone is actually talking to the
+    plant, so nothing is streamed to the LLM while the room is empty.
+
+    The gate opens on a local detection, either webrtcvad speech
+    (`mode="vad"`) or the Porcupine wake word (`mode="wake_word"`), and first
+    replays `preroll_ms` of buffered audio so the opening syllable isn't
+    clipped. It closes again after `close_after_secs` without speech, but never
+    while the bot is talking, so barge-in still reaches the LLM.
+
+    Expects 16-bit mono input at a rate webrtcvad supports (8/16/32/48 kHz);
+    wake-word mode also needs Porcupine's rate (16 kHz).
+    """
+
+    VAD_FRAME_MS = 20
+
+    def __init__(
+        self,
+        mode: str = "vad",
+        *,
+        vad_mode: int = 3,
+        padding_duration_ms: int = 300,
+        preroll_ms: int = 500,
+        close_after_secs: float = 2.0,
+    ) -> None:
+        super().__init__()
+        if mode not in ("vad", "wake_word"):
+            raise ValueError(f"Unknown gate mode '{mode}'")
+        self._mode = mode
+        self._vad = FrameVad(
+            mode=vad_mode,
+            frame_duration_ms=self.VAD_FRAME_MS,
+            padding_duration_ms=padding_duration_ms,
+        )
+        self._porcupine = None
+        if mode == "wake_word":
+            # The wake word comes from the legacy pipeline, whose dependencies
+            # are only installed with the dev group, so import it on demand.
+            from palm_9000.legacy.wake_word import create_porcupine
+
+            self._porcupine = create_porcupine()
+
+        self._close_after_secs = close_after_secs
+
+        self._open = False
+        self._bot_speaking = False
+        self._silent_secs = 0.0
+        self._preroll = PrerollBuffer(preroll_ms / 1000)
+        self._wake_buffer = bytearray()
+
+        self.forwarded_bytes = 0
+        self.held_back_bytes = 0
+
+    @property
+    def is_open(self) -> bool:
+        return self._open
+
+    async def cleanup(self):
+        await super().cleanup()
+        if self._porcupine:
+            self._porcupine.delete()
+            self._porcupine = None
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+
+        if isinstance(frame, BotStartedSpeakingFrame):
+            self._bot_speaking = True
+        elif isinstance(frame, BotStoppedSpeakingFrame):
+            self._bot_speaking = False
+            self._silent_secs = 0.0
+
+        if not isinstance(frame, InputAudioRawFrame):
+            await self.push_frame(frame, direction)
+            return
+
+        is_speech = self._vad.is_speech(frame.audio, frame.sample_rate)
+        if self._open:
+            await self._forward(frame, direction)
+            if is_speech:
+                self._silent_secs = 0.0
+            else:
+                self._silent_secs += len(frame.audio) / (frame.sample_rate * 2)
+            if not self._bot_speaking and self._silent_secs >= self._close_after_secs:
+                logger.debug("Input gate closed")
+                self._open = False
+                self._vad.trigger.reset()
+            return
+
+        self.held_back_bytes += self._preroll.append(frame)
+        if self._mode == "vad":
+            engaged = self._vad.triggered
+        else:
+            engaged = self._heard_wake_word(frame)
+        if engaged:
+            logger.debug("Input gate opened")
+            self._open = True
+            self._silent_secs = 0.0
+            self._wake_buffer.clear()
+            for buffered in self._preroll.drain():
+                await self._forward(buffered, direction)
+
+    async def _forward(self, frame: InputAudioRawFrame, direction: FrameDirection):
+        self.forwarded_bytes += len(frame.audio)
+        await self.push_frame(frame, direction)
+
+    def _heard_wake_word(self, frame: InputAudioRawFrame) -> bool:
+        chunk_size = self._porcupine.frame_length * 2
+        self._wake_buffer.extend(frame.audio)
+        heard = False
+        while len(self._wake_buffer) >= chunk_size:
+            pcm = np.frombuffer(self._wake_buffer[:chunk_size], dtype=np.int16)
+            heard = heard or self._porcupine.process(pcm) >= 0
+            del self._wake_buffer[:chunk_size]
+        return heard
+
+
+class BotAudioMonitor(FrameProcessor):
+    """
+    Sits between the LLM and `transport.output()` and keeps a playback
+    schedule of the bot audio it forwards, so `echo_level()` can tell what the
+    speaker is playing *now* even though the LLM streams faster than real time.
+
+    After `mute()` (a local barge-in) it drops the rest of the interrupted
+    reply, which the service keeps streaming until it notices the
+    interruption itself, until the LLM ends that response or `mute_secs` pass.
+    The service answers the `StartInterruptionFrame` with a response end of
+    its own, so only the end of a response that (re)started after the
+    interruption unmutes.
+    """
+
+    def __init__(self, *, device_latency_secs: float = 0.1, mute_secs: float = 3.0):
+        super().__init__()
+        self._device_latency_secs = device_latency_secs
+        self._mute_secs = mute_secs
+        self._schedule: collections.deque[tuple[float, float]] = collections.deque()
+        self._playhead = 0.0
+        self._muted_until = 0.0
+        self._interrupted = False  # StartInterruptionFrame seen since mute()
+        self._restarted = False  # response started since the interruption
+        self._workspace = dsp.Workspace()
+
+    def echo_level(self) -> float:
+        """Loudest bot audio expected to be audible around now (0..1)."""
+        now = time.monotonic()
+        while self._schedule and self._schedule[0][0] < now - self._device_latency_secs:
+            self._schedule.popleft()
+        level = 0.0
+        for end, lvl in self._schedule:
+            if end - self._device_latency_secs > now + self._device_latency_secs:
+                break
+            level = max(level, lvl)
+        return level
+
+    def mute(self) -> None:
+        self._muted_until = time.monotonic() + self._mute_secs
+        self._interrupted = self._restarted = False
+        self._schedule.clear()
+        self._playhead = 0.0
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+
+        if isinstance(frame, TTSAudioRawFrame):
+            if time.monotonic() < self._muted_until:
+                return
+            now = time.monotonic()
+            start = max(now, self._playhead)
+            self._playhead = start + len(frame.audio) / (
+                frame.sample_rate * frame.num_channels * 2
+            )
+            level = dsp.level(frame.audio, self._workspace)
+            self._schedule.append((self._playhead, level))
+        elif isinstance(frame, (LLMFullResponseStartFrame, TTSStartedFrame)):
+            self._restarted = self._interrupted
+        elif isinstance(frame, LLMFullResponseEndFrame):
+            if self._restarted:
+                self._muted_until = 0.0
+                self._interrupted = self._restarted = False
+        elif isinstance(frame, StartInterruptionFrame):
+            self._interrupted = time.monotonic() < self._muted_until
+            self._restarted = False
+            self._schedule.clear()
+            self._playhead = 0.0
 
         await self.push_frame(frame, direction)
+
+
+class BargeInProcessor(FrameProcessor):
+    """
+    Local barge-in: while the bot is talking, watches the microphone right
+    after `transport.input()` and interrupts as soon as it hears the user,
+    instead of waiting for the remote service to notice.
+
+    A frame counts as the user when webrtcvad says it's speech *and* it is
+    louder than the plant's own echo, estimated as `echo_ratio` times the
+    level `BotAudioMonitor` says is playing. After `min_speech_ms` of that it
+    pushes a `BotInterruptionFrame` upstream (the input transport turns it into
+    a `StartInterruptionFrame`, which flushes queued output audio) and mutes
+    the rest of the interrupted reply.
+    """
+
+    VAD_FRAME_MS = 20
+
+    def __init__(
+        self,
+        monitor: BotAudioMonitor,
+        *,
+        vad_mode: int = 3,
+        echo_ratio: float = 1.0,
+        min_level: float = 0.01,
+        min_speech_ms: int = 120,
+    ) -> None:
+        super().__init__()
+        self._monitor = monitor
+        self._vad = FrameVad(mode=vad_mode, frame_duration_ms=self.VAD_FRAME_MS)
+        self._echo_ratio = echo_ratio
+        self._min_level = min_level
+        self._min_speech_ms = min_speech_ms
+
+        self._bot_speaking = False
+        self._speech_ms = 0
+        self._workspace = dsp.Workspace()
+        self.interruptions = 0
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+
+        if isinstance(frame, BotStartedSpeakingFrame):
+            self._bot_speaking = True
+            self._speech_ms = 0
+        elif isinstance(frame, BotStoppedSpeakingFrame):
+            self._bot_speaking = False
+        elif isinstance(frame, InputAudioRawFrame) and self._bot_speaking:
+            if self._heard_user(frame):
+                logger.debug("Local barge-in, interrupting the bot")
+                self.interruptions += 1
+                self._bot_speaking = False
+                self._monitor.mute()
+                await self.push_frame(BotInterruptionFrame(), FrameDirection.UPSTREAM)
+
+        await self.push_frame(frame, direction)
+
+    def _heard_user(self, frame: InputAudioRawFrame) -> bool:
+        threshold = max(self._min_level, self._echo_ratio * self._monitor.echo_level())
+        for chunk, is_speech in self._vad.frames(frame.audio, frame.sample_rate):
+            if is_speech and dsp.level(chunk, self._workspace) > threshold:
+                self._speech_ms += self.VAD_FRAME_MS
+            else:
+                self._speech_ms = 0
+            if self._speech_ms >= self._min_speech_ms:
+                self._speech_ms = 0
+                self._vad.clear()
+                return True
+        return False
@@ -0,0 +1,278 @@
+import asyncio
+import queue
+import threading
+import time
+import wave
+from pathlib import Path
+
+from loguru import logger
+from pipecat.frames.frames import (
+    BotStartedSpeakingFrame,
+    BotStoppedSpeakingFrame,
+    CancelFrame,
+    EndFrame,
+    Frame,
+    InputAudioRawFrame,
+    OutputAudioRawFrame,
+    StartFrame,
+    StartInterruptionFrame,
+    UserStartedSpeakingFrame,
+)
+from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
+
+from palm_9000.legacy.vad import FrameVad, PrerollBuffer
+
+# Queue messages for the writer thread.
+_AUDIO, _SEGMENT, _STOP = range(3)
+
+
+class _TrackWriter:
+    """
+    One open WAV or FLAC file for one track of the current turn.
+    """
+
+    def __init__(self, path: Path, sample_rate: int, num_channels: int) -> None:
+        self.path = path
+        self.bytes_written = 0
+        if path.suffix == ".flac":
+            # soundfile is not a project dependency; only needed for FLAC.
+            import soundfile as sf
+
+            self._flac = sf.SoundFile(
+                path, "w", sample_rate, num_channels, "PCM_16", format="FLAC"
+            )
+            self._wav = None
+        else:
+            self._flac = None
+            self._wav = wave.open(str(path), "wb")
+            self._wav.setnchannels(num_channels)
+            self._wav.setsampwidth(2)
+            self._wav.setframerate(sample_rate)
+
+    def write(self, audio: bytes) -> None:
+        if self._flac:
+            self._flac.buffer_write(audio, dtype="int16")
+        else:
+            self._wav.writeframesraw(audio)
+        self.bytes_written += len(audio)
+
+    def close(self) -> None:
+        if self._flac:
+            self._flac.close()
+        else:
+            self._wav.close()
+
+
+class ConversationRecorder(FrameProcessor):
+    """
+    Streams user (microphone) and bot audio to disk, one file per track per
+    turn, e.g. `20250801-101500-0003-user.wav` and `...-0003-bot.wav`.
+
+    Idle microphone audio is not recorded. A turn starts when the user is
+    heard (webrtcvad speech, or a `UserStartedSpeakingFrame` from a transport
+    VAD), with `preroll_ms` of audio before it, and ends when the bot stops
+    speaking or is interrupted, or after `idle_secs` without speech while the
+    bot is quiet.
+
+    Audio frames are handed to a background writer thread through a bounded
+    queue, so the event loop never waits on the SD card. If the writer falls
+    behind by more than `max_queue` frames, new frames are dropped and counted
+    in `dropped_frames` instead of growing memory.
+
+    Files are rotated by size: a track file is continued in a new `-partN`
+    file after `max_file_mb`, and the oldest recordings are deleted once the
+    directory holds more than `max_total_mb`.
+
+    Place it after `transport.output()` so it sees bot audio as it is played.
+    """
+
+    VAD_FRAME_MS = 20
+
+    def __init__(
+        self,
+        directory: str | Path,
+        *,
+        file_format: str = "wav",
+        max_queue: int = 500,
+        max_file_mb: float = 20.0,
+        max_total_mb: float = 500.0,
+        vad_mode: int = 3,
+        preroll_ms: int = 500,
+        idle_secs: float = 5.0,
+    ) -> None:
+        super().__init__()
+        if file_format not in ("wav", "flac"):
+            raise ValueError(f"Unsupported recording format: {file_format}")
+        self.directory = Path(directory)
+        self.file_format = file_format
+        self.max_file_bytes = int(max_file_mb * 1024 * 1024)
+        self.max_total_bytes = int(max_total_mb * 1024 * 1024)
+        self.preroll_ms = preroll_ms
+        self.idle_secs = idle_secs
+
+        # Same detector as the input gate.
+        self._vad = FrameVad(
+            mode=vad_mode, frame_duration_ms=self.VAD_FRAME_MS, padding_duration_ms=300
+        )
+        self._preroll = PrerollBuffer(preroll_ms / 1000)
+        self._in_turn = False
+        self._bot_speaking = False
+        self._silent_secs = 0.0
+
+        self.dropped_frames = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._thread: threading.Thread | None = None
+        self._prefix = time.strftime("%Y%m%d-%H%M%S")
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+
+        if isinstance(frame, StartFrame):
+            self._start()
+        elif isinstance(frame, InputAudioRawFrame):
+            self._record_user(frame)
+        elif isinstance(frame, OutputAudioRawFrame):
+            self._put((_AUDIO, "bot", frame))
+        elif isinstance(frame, UserStartedSpeakingFrame):
+            self._start_turn()
+        elif isinstance(frame, BotStartedSpeakingFrame):
+            self._bot_speaking = True
+        elif isinstance(frame, (BotStoppedSpeakingFrame, StartInterruptionFrame)):
+            self._bot_speaking = False
+            self._end_turn()
+        elif isinstance(frame, (EndFrame, CancelFrame)):
+            await self._stop()
+
+        await self.push_frame(frame, direction)
+
+    async def cleanup(self):
+        await super().cleanup()
+        await self._stop()
+
+    def _start(self) -> None:
+        if self._thread:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._thread = threading.Thread(
+            target=self._writer, name="conversation-recorder", daemon=True
+        )
+        self._thread.start()
+
+    async def _stop(self) -> None:
+        if not self._thread:
+            return
+        thread, self._thread = self._thread, None
+        # Blocking put: the stop marker must not be dropped.
+        await asyncio.to_thread(self._queue.put, (_STOP,))
+        await asyncio.to_thread(thread.join, 5)
+        if self.dropped_frames:
+            logger.warning(f"Recorder dropped {self.dropped_frames} audio frames")
+
+    def _record_user(self, frame: InputAudioRawFrame) -> None:
+        is_speech = self._vad.is_speech(frame.audio, frame.sample_rate)
+        if not self._in_turn:
+            self._preroll.append(frame)
+            if self._vad.triggered:
+                self._start_turn()
+            return
+
+        self._put((_AUDIO, "user", frame))
+        if is_speech:
+            self._silent_secs = 0.0
+        else:
+            self._silent_secs += len(frame.audio) / (
+                frame.sample_rate * frame.num_channels * 2
+            )
+        if not self._bot_speaking and self._silent_secs >= self.idle_secs:
+            self._end_turn()
+
+    def _start_turn(self) -> None:
+        if self._in_turn:
+            return
+        self._in_turn = True
+        self._silent_secs = 0.0
+        for frame in self._preroll.drain():
+            self._put((_AUDIO, "user", frame))
+
+    def _end_turn(self) -> None:
+        self._in_turn = False
+        self._vad.trigger.reset()
+        self._put((_SEGMENT,))
+
+    def _put(self, item: tuple) -> None:
+        if not self._thread:
+            return
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.dropped_frames += 1
+
+    def _writer(self) -> None:
+        """Runs in the writer thread."""
+        writers: dict[str, _TrackWriter] = {}
+        turn = 0
+        parts: dict[str, int] = {}
+
+        def close(writer: _TrackWriter) -> None:
+            try:
+                writer.close()
+            except Exception as e:
+                logger.error(f"Recorder error closing {writer.path}: {e}")
+
+        def close_all():
+            for writer in writers.values():
+                close(writer)
+            writers.clear()
+            parts.clear()
+
+        while True:
+            item = self._queue.get()
+            try:
+                if item[0] == _STOP:
+                    close_all()
+                    return
+                if item[0] == _SEGMENT:
+                    if writers:
+                        close_all()
+                        turn += 1
+                    continue
+
+                _, track, frame = item
+                writer = writers.get(track)
+                if writer and writer.bytes_written >= self.max_file_bytes:
+                    writer.close()
+                    parts[track] = parts.get(track, 1) + 1
+                    writer = None
+                if not writer:
+                    writer = writers[track] = self._open(
+                        track, turn, parts.get(track, 1), frame
+                    )
+                writer.write(frame.audio)
+            except Exception as e:
+                # Keep the thread alive; losing one file beats losing the rest.
+                logger.error(f"Recorder error: {e}")
+                if item[0] == _AUDIO and (writer := writers.pop(item[1], None)):
+                    # Drop the broken file, but don't leak its handle.
+                    close(writer)
+
+    def _open(
+        self, track: str, turn: int, part: int, frame: InputAudioRawFrame
+    ) -> _TrackWriter:
+        name = f"{self._prefix}-{turn:04d}-{track}"
+        if part > 1:
+            name += f"-part{part}"
+        path = self.directory / f"{name}.{self.file_format}"
+        self._enforce_total_size()
+        return _TrackWriter(path, frame.sample_rate, frame.num_channels)
+
+    def _enforce_total_size(self) -> None:
+        files = sorted(
+            (p for p in self.directory.glob(f"*.{self.file_format}") if p.is_file()),
+            key=lambda p: p.stat().st_mtime,
+        )
+        total = sum(p.stat().st_size for p in files)
+        for path in files:
+            if total <= self.max_total_bytes:
+                break
+            total -= path.stat().st_size
+            path.unlink(missing_ok=True)
@@ -0,0 +1,414 @@
+import asyncio
+import base64
+import json
+import resource
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+from loguru import logger
+from pipecat.frames.frames import (
+    CancelFrame,
+    EndFrame,
+    InputAudioRawFrame,
+    OutputAudioRawFrame,
+    StartFrame,
+)
+from pipecat.processors.frame_processor import FrameProcessor
+from pipecat.services.gemini_multimodal_live import gemini
+from pipecat.services.gemini_multimodal_live.gemini import (
+    GeminiMultimodalLiveLLMService,
+)
+from pipecat.transports.base_input import BaseInputTransport
+from pipecat.transports.base_output import BaseOutputTransport
+from pipecat.transports.base_transport import BaseTransport, TransportParams
+from pydantic import BaseModel
+from websockets.asyncio.server import ServerConnection, serve
+
+from palm_9000 import dsp
+
+
+def read_wav(path: str | Path, sample_rate: int) -> bytes:
+    """
+    Read a 16-bit mono WAV file and return its PCM frames.
+    The file must already be at `sample_rate`; the harness doesn't resample so
+    that resampling cost never leaks into the measurements.
+    """
+    with wave.open(str(path), "rb") as wf:
+        if wf.getsampwidth() != 2 or wf.getnchannels() != 1:
+            raise ValueError(f"{path}: expected 16-bit mono PCM")
+        if wf.getframerate() != sample_rate:
+            raise ValueError(
+                f"{path}: expected {sample_rate} Hz, got {wf.getframerate()} Hz"
+            )
+        return wf.readframes(wf.getnframes())
+
+
+class WavInputTransport(BaseInputTransport):
+    """
+    Stands in for `LocalAudioInputTransport`: plays a recorded utterance into
+    the pipeline at real-time pace in 20 ms frames, then keeps feeding silence
+    the way an idle microphone would.
+    """
+
+    def __init__(self, audio: bytes, params: TransportParams) -> None:
+        super().__init__(params)
+        self._audio = audio
+        self._feed_task: asyncio.Task | None = None
+        self.audio_secs = len(audio) / (
+            params.audio_in_sample_rate * 2 * params.audio_in_channels
+        )
+        self.utterance_ended_at: float | None = None
+
+    async def start(self, frame: StartFrame):
+        await super().start(frame)
+        await self.set_transport_ready(frame)
+        if not self._feed_task:
+            self._feed_task = self.create_task(self._feed())
+
+    async def stop(self, frame: EndFrame):
+        await self._cancel_feed()
+        await super().stop(frame)
+
+    async def cancel(self, frame: CancelFrame):
+        await self._cancel_feed()
+        await super().cancel(frame)
+
+    async def _cancel_feed(self) -> None:
+        if self._feed_task:
+            await self.cancel_task(self._feed_task)
+            self._feed_task = None
+
+    async def _feed(self) -> None:
+        channels = self._params.audio_in_channels
+        chunk_size = int(self.sample_rate / 100) * 2 * 2 * channels  # 20ms of audio
+        silence = b"\x00" * chunk_size
+        period = chunk_size / (self.sample_rate * 2 * channels)
+
+        # Pace against an absolute clock so scheduling jitter doesn't accumulate.
+        next_at = time.monotonic()
+        offset = 0
+        while True:
+            if offset < len(self._audio):
+                chunk = self._audio[offset : offset + chunk_size]
+                chunk = chunk.ljust(chunk_size, b"\x00")
+                offset += chunk_size
+                if offset >= len(self._audio):
+                    self.utterance_ended_at = next_at + period
+            else:
+                chunk = silence
+            await self.push_audio_frame(
+                InputAudioRawFrame(
+                    audio=chunk, sample_rate=self.sample_rate, num_channels=channels
+                )
+            )
+            next_at += period
+            await asyncio.sleep(max(0.0, next_at - time.monotonic()))
+
+
+class WavOutputTransport(BaseOutputTransport):
+    """
+    Stands in for `LocalAudioOutputTransport`: writes bot audio to a WAV file
+    and blocks for the chunk duration, like a sound card draining its buffer.
+    """
+
+    def __init__(self, path: str | Path | None, params: TransportParams) -> None:
+        super().__init__(params)
+        self._path = path
+        self._wav: wave.Wave_write | None = None
+        self.first_audio_at: float | None = None
+        self.last_audio_at: float | None = None
+        self.audio_bytes = 0
+
+    async def start(self, frame: StartFrame):
+        await super().start(frame)
+        if self._path and not self._wav:
+            self._wav = wave.open(str(self._path), "wb")
+            self._wav.setnchannels(self._params.audio_out_channels)
+            self._wav.setsampwidth(2)
+            self._wav.setframerate(self.sample_rate)
+        await self.set_transport_ready(frame)
+
+    async def cleanup(self):
+        await super().cleanup()
+        if self._wav:
+            self._wav.close()
+            self._wav = None
+
+    async def write_audio_frame(self, frame: OutputAudioRawFrame):
+        now = time.monotonic()
+        if self.first_audio_at is None:
+            self.first_audio_at = now
+        self.audio_bytes += len(frame.audio)
+        if self._wav:
+            self._wav.writeframes(frame.audio)
+        await asyncio.sleep(
+            len(frame.audio) / (self.sample_rate * 2 * frame.num_channels)
+        )
+        self.last_audio_at = time.monotonic()
+
+
+class WavTransport(BaseTransport):
+    """
+    Drop-in replacement for `LocalAudioTransport` that reads the user side from
+    a WAV recording and captures the bot side to a WAV file.
+    """
+
+    def __init__(
+        self, audio: bytes, params: TransportParams, output_path: str | Path | None
+    ) -> None:
+        super().__init__()
+        self._params = params
+        self._input = WavInputTransport(audio, params)
+        self._output = WavOutputTransport(output_path, params)
+
+    def input(self) -> FrameProcessor:
+        return self._input
+
+    def output(self) -> FrameProcessor:
+        return self._output
+
+
+class FakeGeminiLiveServer:
+    """
+    A local websocket stand-in for the Gemini Live API.
+
+    It answers the setup message, watches incoming `realtimeInput` audio with a
+    crude energy detector, and once it has heard speech followed by
+    `silence_secs` of quiet it waits `response_delay_secs` and streams the next
+    canned response as `modelTurn` audio chunks, followed by `turnComplete`.
+
+    Responses must be 24 kHz 16-bit mono PCM, which is what the real service
+    returns.
+    """
+
+    SAMPLE_RATE = 24000
+
+    def __init__(
+        self,
+        responses: list[bytes],
+        response_delay_secs: float = 0.5,
+        silence_secs: float = 0.5,
+        chunk_secs: float = 0.04,
+        speech_threshold: float = 0.02,
+    ) -> None:
+        if not responses:
+            raise ValueError("At least one canned response is required")
+        self.responses = responses
+        self.response_delay_secs = response_delay_secs
+        self.silence_secs = silence_secs
+        self.chunk_secs = chunk_secs
+        self.speech_threshold = speech_threshold
+        self.port: int | None = None
+        self.turns = 0
+        self.upstream_bytes = 0
+        self._server = None
+
+    @property
+    def base_url(self) -> str:
+        return f"127.0.0.1:{self.port}/ws"
+
+    async def __aenter__(self) -> "FakeGeminiLiveServer":
+        self._server = await serve(self._handle, "127.0.0.1", 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, ws: ServerConnection) -> None:
+        heard_speech = False
+        quiet_secs = 0.0
+        responding: asyncio.Task | None = None
+        workspace = dsp.Workspace()
+        try:
+            async for message in ws:
+                msg = json.loads(message)
+                if "setup" in msg:
+                    await ws.send(json.dumps({"setupComplete": {}}))
+                    continue
+                chunks = msg.get("realtimeInput", {}).get("mediaChunks") or []
+                for chunk in chunks:
+                    pcm = base64.b64decode(chunk["data"])
+                    self.upstream_bytes += len(pcm)
+                    rate = int(chunk["mimeType"].rsplit("=", 1)[-1])
+                    level = dsp.level(pcm, workspace)
+                    if level >= self.speech_threshold:
+                        heard_speech = True
+                        quiet_secs = 0.0
+                    elif heard_speech:
+                        quiet_secs += len(pcm) / 2 / rate
+                    busy = responding and not responding.done()
+                    if heard_speech and quiet_secs >= self.silence_secs and not busy:
+                        heard_speech = False
+                        responding = asyncio.create_task(self._respond(ws))
+        finally:
+            if responding:
+                responding.cancel()
+
+    async def _respond(self, ws: ServerConnection) -> None:
+        await asyncio.sleep(self.response_delay_secs)
+        audio = self.responses[self.turns % len(self.responses)]
+        self.turns += 1
+        step = int(self.SAMPLE_RATE * self.chunk_secs) * 2
+        for offset in range(0, len(audio), step):
+            part = {
+                "inlineData": {
+                    "mimeType": f"audio/pcm;rate={self.SAMPLE_RATE}",
+                    "data": base64.b64encode(audio[offset : offset + step]).decode(),
+                }
+            }
+            await ws.send(
+                json.dumps({"serverContent": {"modelTurn": {"parts": [part]}}})
+            )
+            # The real service streams roughly as fast as it synthesizes.
+            await asyncio.sleep(0)
+        await ws.send(
+            json.dumps(
+                {
+                    "serverContent": {"turnComplete": True},
+                    "usageMetadata": {"totalTokenCount": 0},
+                }
+            )
+        )
+
+
+class LocalGeminiLiveLLMService(GeminiMultimodalLiveLLMService):
+    """
+    `GeminiMultimodalLiveLLMService` pointed at a `FakeGeminiLiveServer`.
+    The upstream service hardcodes `wss://`; the stand-in speaks plain `ws://`.
+    """
+
+    def __init__(self, server: FakeGeminiLiveServer, **kwargs) -> None:
+        super().__init__(api_key="replay", base_url=server.base_url, **kwargs)
+
+    async def _connect(self):
+        connect = gemini.websocket_connect
+        gemini.websocket_connect = lambda uri, **kw: connect(
+            uri=uri.replace("wss://", "ws://", 1), **kw
+        )
+        try:
+            await super()._connect()
+        finally:
+            gemini.websocket_connect = connect
+
+
+class EventLoopLagMonitor:
+    """
+    Measures how late the event loop wakes a task that asked to sleep for
+    `interval` seconds. Anything above a few ms means something is hogging
+    the loop (audio callbacks, heart rendering, JSON/base64 work, ...).
+    """
+
+    def __init__(self, interval: float = 0.01) -> None:
+        self.interval = interval
+        self.samples: list[float] = []
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            t0 = time.monotonic()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.monotonic() - t0 - self.interval))
+
+
+class ScenarioResult(BaseModel):
+    name: str
+    input_secs: float
+    output_secs: float
+    e2e_latency_ms: float | None
+    real_time_factor: float
+    cpu_percent: float
+    loop_lag_p50_ms: float
+    loop_lag_p99_ms: float
+    loop_lag_max_ms: float
+    peak_rss_mb: float
+    upstream_bytes: int
+
+    def __str__(self) -> str:
+        latency = (
+            f"{self.e2e_latency_ms:.0f} ms"
+            if self.e2e_latency_ms is not None
+            else "n/a"
+        )
+        return (
+            f"{self.name}: e2e={latency} rtf={self.real_time_factor:.3f} "
+            f"cpu={self.cpu_percent:.1f}% "
+            f"lag p50/p99/max={self.loop_lag_p50_ms:.1f}/{self.loop_lag_p99_ms:.1f}/"
+            f"{self.loop_lag_max_ms:.1f} ms peak_rss={self.peak_rss_mb:.1f} MB "
+            f"in={self.input_secs:.2f}s out={self.output_secs:.2f}s"
+        )
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux. It's a process-wide high-water mark, so
+    # run one scenario per process when comparing peak memory.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+async def wait_for_reply(
+    transport: WavTransport, timeout: float, tail_secs: float = 1.0
+) -> None:
+    """
+    Return once the bot has spoken and then been quiet for `tail_secs`, or
+    after `timeout` seconds.
+    """
+    output = transport.output()
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        await asyncio.sleep(0.1)
+        last = output.last_audio_at
+        if last is not None and time.monotonic() - last >= tail_secs:
+            return
+    logger.warning(f"No complete reply within {timeout} seconds")
+
+
+def summarize(
+    name: str,
+    transport: WavTransport,
+    server: FakeGeminiLiveServer,
+    lag: EventLoopLagMonitor,
+    wall_secs: float,
+    cpu_secs: float,
+) -> ScenarioResult:
+    input_transport = transport.input()
+    output_transport = transport.output()
+    input_secs = input_transport.audio_secs
+    output_secs = output_transport.audio_bytes / (
+        max(output_transport.sample_rate, 1) * 2
+    )
+
+    latency = None
+    if output_transport.first_audio_at and input_transport.utterance_ended_at:
+        latency = (
+            output_transport.first_audio_at - input_transport.utterance_ended_at
+        ) * 1000
+
+    lags = np.array(lag.samples or [0.0]) * 1000
+    return ScenarioResult(
+        name=name,
+        input_secs=input_secs,
+        output_secs=output_secs,
+        e2e_latency_ms=latency,
+        real_time_factor=cpu_secs / max(input_secs + output_secs, 1e-9),
+        cpu_percent=100.0 * cpu_secs / max(wall_secs, 1e-9),
+        loop_lag_p50_ms=float(np.percentile(lags, 50)),
+        loop_lag_p99_ms=float(np.percentile(lags, 99)),
+        loop_lag_max_ms=float(lags.max()),
+        peak_rss_mb=peak_rss_mb(),
+        upstream_bytes=server.upstream_bytes,
+    )
@@ -0,0 +1,123 @@
+import os
+import resource
+import time
+
+import numpy as np
+from loguru import logger
+from pydantic import BaseModel
+
+
+def parse_cpu_list(spec: str) -> set[int]:
+    """
+    Parse a Linux-style CPU list such as "0", "1-3" or "0,2-3".
+    """
+    cpus: set[int] = set()
+    for part in spec.replace(" ", "").split(","):
+        if not part:
+            continue
+        first, _, last = part.partition("-")
+        cpus.update(range(int(first), int(last or first) + 1))
+    return cpus
+
+
+def pin_to_cpus(cpus: str | set[int], name: str = "process") -> None:
+    """
+    Restrict the calling process (and threads it starts afterwards) to `cpus`.
+    An empty list leaves the affinity alone.
+    """
+    if isinstance(cpus, str):
+        cpus = parse_cpu_list(cpus)
+    if not cpus:
+        return
+    try:
+        os.sched_setaffinity(0, cpus)
+    except (AttributeError, OSError, ValueError) as e:
+        # Not on Linux, or the CPUs don't exist on this board.
+        logger.warning(f"Could not pin {name} to CPUs {sorted(cpus)}: {e}")
+        return
+    logger.info(f"Pinned {name} to CPUs {sorted(cpus)}")
+
+
+def set_realtime(priority: int, name: str = "thread") -> bool:
+    """
+    Give the calling thread SCHED_FIFO scheduling at `priority` (1..99), capped
+    at RLIMIT_RTPRIO for unprivileged users. Without the privilege it logs a
+    warning and leaves the thread alone; returns whether it worked.
+    """
+    try:
+        if os.geteuid() != 0:
+            limit = resource.getrlimit(resource.RLIMIT_RTPRIO)[0]
+            if limit != resource.RLIM_INFINITY:
+                priority = min(priority, limit)
+        if priority < 1:
+            raise PermissionError("RLIMIT_RTPRIO is 0")
+        os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(priority))
+    except (AttributeError, OSError) as e:
+        # Not on Linux, or neither CAP_SYS_NICE nor an rtprio limit
+        # (/etc/security/limits.conf) allows it.
+        logger.warning(f"Could not give {name} real-time priority: {e}")
+        return False
+    logger.info(f"{name} runs SCHED_FIFO at priority {priority}")
+    return True
+
+
+class ThreadProfile(BaseModel):
+    """
+    Scheduling for a latency-critical thread: CPU affinity and, optionally,
+    real-time priority. `apply()` from inside the thread itself.
+    """
+
+    realtime: bool = False
+    priority: int = 70
+    cpus: str = ""
+
+    def apply(self, name: str) -> None:
+        pin_to_cpus(self.cpus, name)
+        if self.realtime:
+            set_realtime(self.priority, name)
+
+
+class LatencyStats:
+    """
+    Rolling window of scheduling latencies (seconds), e.g. how late an audio
+    thread woke up. `add()` is cheap enough to call from the audio thread
+    itself; read `summary()` from anywhere else.
+    """
+
+    def __init__(self, window: int = 4096) -> None:
+        self._samples = np.zeros(window, dtype=np.float64)
+        self._next = 0
+        self.count = 0
+        self.max = 0.0
+        self._reported_at = time.monotonic()
+
+    def add(self, secs: float) -> None:
+        self._samples[self._next] = secs
+        self._next = (self._next + 1) % self._samples.size
+        self.count += 1
+        if secs > self.max:
+            self.max = secs
+
+    def reset(self) -> None:
+        self._next = 0
+        self.count = 0
+        self.max = 0.0
+
+    def summary(self) -> dict[str, float]:
+        samples = self._samples[: min(self.count, self._samples.size)]
+        if not samples.size:
+            return {"count": 0}
+        p50, p99 = np.percentile(samples, [50, 99])
+        return {
+            "count": self.count,
+            "p50_ms": round(1000 * float(p50), 3),
+            "p99_ms": round(1000 * float(p99), 3),
+            "max_ms": round(1000 * self.max, 3),
+        }
+
+    def report_every(self, secs: float, name: str) -> None:
+        """Log the summary at most every `secs`. Call from the event loop."""
+        now = time.monotonic()
+        if now - self._reported_at >= secs:
+            self._reported_at = now
+            logger.info(f"{name} scheduling latency: {self.summary()}")
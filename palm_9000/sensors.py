@@ -0,0 +1,178 @@
+import asyncio
+import statistics
+from enum import StrEnum
+from typing import Protocol
+
+from loguru import logger
+from pipecat.frames.frames import (
+    CancelFrame,
+    EndFrame,
+    Frame,
+    LLMMessagesAppendFrame,
+    StartFrame,
+)
+from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
+
+
+class MoistureState(StrEnum):
+    DRY = "dry"
+    OK = "ok"
+    SOAKED = "soaked"
+
+
+class AnalogReader(Protocol):
+    def read(self, channel: int = 0) -> int: ...
+
+
+class MoistureClassifier:
+    """
+    Turns moisture readings (0..255, higher = wetter) into a `MoistureState`.
+
+    Hysteresis: a state is entered at its threshold but only left once the
+    reading is `hysteresis` past it, so a value hovering on a threshold
+    doesn't flap. Debounce: a new state must be seen in `debounce` consecutive
+    readings before it's reported.
+    """
+
+    def __init__(
+        self,
+        dry_below: int = 80,
+        soaked_above: int = 200,
+        hysteresis: int = 8,
+        debounce: int = 3,
+    ) -> None:
+        if dry_below >= soaked_above:
+            raise ValueError("dry_below must be lower than soaked_above")
+        self.dry_below = dry_below
+        self.soaked_above = soaked_above
+        self.hysteresis = hysteresis
+        self.debounce = debounce
+
+        self.state: MoistureState | None = None
+        self._candidate: MoistureState | None = None
+        self._count = 0
+
+    def update(self, value: float) -> MoistureState | None:
+        """
+        Feed one reading. Returns the new state when it changes, else None.
+        """
+        lo = self.dry_below
+        if self.state == MoistureState.DRY:
+            lo += self.hysteresis
+        hi = self.soaked_above
+        if self.state == MoistureState.SOAKED:
+            hi -= self.hysteresis
+
+        if value < lo:
+            raw = MoistureState.DRY
+        elif value > hi:
+            raw = MoistureState.SOAKED
+        else:
+            raw = MoistureState.OK
+
+        if raw == self.state:
+            self._candidate, self._count = None, 0
+            return None
+        if raw != self._candidate:
+            self._candidate, self._count = raw, 0
+        self._count += 1
+        if self._count < self.debounce:
+            return None
+
+        self.state = raw
+        self._candidate, self._count = None, 0
+        return raw
+
+
+class SoilMoistureSensor(FrameProcessor):
+    """
+    Samples the soil-moisture probe every `interval_secs` and tells the LLM
+    when the plant's moisture state changes (dry / ok / soaked).
+
+    ADC reads bit-bang GPIO with sleeps, so they run in a worker thread. Each
+    sample is the median of `samples_per_read` reads, which also filters the
+    ADC0834's occasional checksum-mismatch zeros. Readings go through a
+    `MoistureClassifier`; only a state change pushes an
+    `LLMMessagesAppendFrame`, so steady readings cost no pipeline or LLM work.
+    Being `ok` at startup is not announced.
+
+    Place it before the LLM.
+    """
+
+    MESSAGES = {
+        MoistureState.DRY: "Your soil has gone dry. You are thirsty.",
+        MoistureState.OK: "Your soil moisture is back to a comfortable level.",
+        MoistureState.SOAKED: "Your soil is soaked. You have been overwatered.",
+    }
+
+    def __init__(
+        self,
+        adc: AnalogReader,
+        *,
+        channel: int = 0,
+        invert: bool = True,
+        interval_secs: float = 5.0,
+        samples_per_read: int = 5,
+        classifier: MoistureClassifier | None = None,
+    ) -> None:
+        super().__init__()
+        self.adc = adc
+        self.channel = channel
+        self.invert = invert
+        self.interval_secs = interval_secs
+        self.samples_per_read = samples_per_read
+        self.classifier = classifier or MoistureClassifier()
+        self.moisture: float | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def state(self) -> MoistureState | None:
+        return self.classifier.state
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+
+        if isinstance(frame, StartFrame):
+            await self.push_frame(frame, direction)
+            if not self._task:
+                self._task = self.create_task(self._sample_task_handler())
+            return
+        if isinstance(frame, (EndFrame, CancelFrame)):
+            await self._stop()
+
+        await self.push_frame(frame, direction)
+
+    async def cleanup(self):
+        await super().cleanup()
+        await self._stop()
+
+    async def _stop(self) -> None:
+        if self._task:
+            await self.cancel_task(self._task)
+            self._task = None
+
+    def _read(self) -> float:
+        """Runs in a worker thread."""
+        values = [self.adc.read(self.channel) for _ in range(self.samples_per_read)]
+        value = statistics.median(values)
+        return 255 - value if self.invert else value
+
+    async def _sample_task_handler(self):
+        while True:
+            try:
+                self.moisture = await asyncio.to_thread(self._read)
+            except Exception as e:
+                logger.error(f"Moisture sensor read failed: {e}")
+            else:
+                previous = self.classifier.state
+                state = self.classifier.update(self.moisture)
+                if state and not (previous is None and state == MoistureState.OK):
+                    await self._announce(state)
+            await asyncio.sleep(self.interval_secs)
+
+    async def _announce(self, state: MoistureState) -> None:
+        logger.info(f"Soil moisture now {state} ({self.moisture:.0f}/255)")
+        content = f"[Soil moisture sensor, not the user] {self.MESSAGES[state]}"
+        await self.push_frame(
+            LLMMessagesAppendFrame(messages=[{"role": "user", "content": content}])
+        )
@@ -0,0 +1,182 @@
+import asyncio
+import json
+
+from loguru import logger
+from pipecat.frames.frames import (
+    CancelFrame,
+    EndFrame,
+    Frame,
+    InputAudioRawFrame,
+    LLMMessagesAppendFrame,
+)
+from pipecat.processors.frame_processor import FrameDirection
+from pipecat.services.gemini_multimodal_live.gemini import (
+    GeminiMultimodalLiveLLMService,
+)
+from websockets.exceptions import ConnectionClosed
+
+from palm_9000 import dsp
+from palm_9000.legacy.vad import PrerollBuffer
+
+
+class ParkableGeminiLiveLLMService(GeminiMultimodalLiveLLMService):
+    """
+    A Gemini Live service whose websocket can be parked while the pipeline
+    keeps running, so a new conversation only pays for the handshake instead
+    of a full cold start.
+
+    - `park()` closes the websocket (call it from the task's idle handler).
+    - While parked, input audio is kept in a short pre-roll buffer and the
+      connection is re-opened as soon as the input level crosses
+      `unpark_level`. The pre-roll is sent once the socket is back so the
+      first syllable reaches the model. During the handshake the buffer may
+      grow by up to `handshake_secs` more; beyond that (e.g. reconnects
+      failing in a network outage) the oldest audio is dropped.
+    - Messages appended while parked (e.g. sensor updates) re-open the
+      connection and are sent once it's back.
+    - `prewarm()` re-opens the connection ahead of time, e.g. from a sensor.
+    - If the server drops the socket or a send fails, only the connection is
+      restarted (with backoff) instead of failing the whole pipeline.
+    """
+
+    def __init__(
+        self,
+        *,
+        unpark_level: float = 0.02,
+        preroll_secs: float = 0.5,
+        handshake_secs: float = 5.0,
+        max_reconnect_delay_secs: float = 30.0,
+        **kwargs,
+    ) -> None:
+        super().__init__(**kwargs)
+        self.unpark_level = unpark_level
+        self.preroll_secs = preroll_secs
+        self.handshake_secs = handshake_secs
+        self.max_reconnect_delay_secs = max_reconnect_delay_secs
+
+        self._parked = False
+        self._preroll = PrerollBuffer(preroll_secs)
+        self._pending_messages: list[list[dict]] = []
+        self._reconnect_task: asyncio.Task | None = None
+        self._reconnect_attempts = 0
+        self._workspace = dsp.Workspace()
+
+    @property
+    def parked(self) -> bool:
+        return self._parked
+
+    async def park(self) -> None:
+        if self._parked:
+            return
+        logger.info("Parking Gemini Live connection")
+        self._parked = True
+        await self._cancel_reconnect()
+        await self._disconnect()
+
+    def set_system_instruction(self, system_instruction: str) -> None:
+        """Takes effect on the next (re)connect, e.g. after un-parking."""
+        self._system_instruction = system_instruction
+
+    async def prewarm(self) -> None:
+        """Re-open a parked connection without waiting for speech."""
+        if self._parked:
+            self._schedule_reconnect()
+
+    async def stop(self, frame: EndFrame):
+        await self._cancel_reconnect()
+        await super().stop(frame)
+
+    async def cancel(self, frame: CancelFrame):
+        await self._cancel_reconnect()
+        await super().cancel(frame)
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        if self._parked and isinstance(frame, InputAudioRawFrame):
+            # Skip the base class so nothing is sent on the closed socket, but
+            # still run the FrameProcessor bookkeeping and pass the frame on.
+            await super(GeminiMultimodalLiveLLMService, self).process_frame(
+                frame, direction
+            )
+            self._buffer_preroll(frame)
+            if self._level(frame.audio) >= self.unpark_level:
+                self._schedule_reconnect()
+            await self.push_frame(frame, direction)
+            return
+        if self._parked and isinstance(frame, LLMMessagesAppendFrame):
+            await super(GeminiMultimodalLiveLLMService, self).process_frame(
+                frame, direction
+            )
+            self._pending_messages.append(frame.messages)
+            self._schedule_reconnect()
+            return
+        await super().process_frame(frame, direction)
+
+    async def _receive_task_handler(self):
+        reason = "closed by server"
+        try:
+            await super()._receive_task_handler()
+        except ConnectionClosed as e:
+            # A clean close just ends the iterator, an abnormal one (no close
+            # frame, network blip) raises instead.
+            reason = f"lost ({e})"
+        # If we didn't close the socket ourselves (session limit, network blip)
+        # reconnect pre-emptively so the next utterance doesn't find a dead one.
+        if not self._disconnecting and not self._parked:
+            logger.warning(f"Gemini Live connection {reason}; reconnecting")
+            self._websocket = None
+            self._schedule_reconnect()
+
+    async def _ws_send(self, message):
+        try:
+            if self._websocket:
+                await self._websocket.send(json.dumps(message))
+        except Exception as e:
+            if self._disconnecting:
+                return
+            # Unlike the base class, don't escalate to a fatal ErrorFrame: the
+            # transport and hardware are fine, only the connection needs a restart.
+            logger.error(f"Error sending message to websocket: {e}; reconnecting")
+            self._websocket = None
+            self._schedule_reconnect()
+
+    def _schedule_reconnect(self) -> None:
+        if self._reconnect_task and not self._reconnect_task.done():
+            return
+        self._reconnect_task = self.create_task(self._reconnect())
+
+    async def _cancel_reconnect(self) -> None:
+        if self._reconnect_task:
+            await self.cancel_task(self._reconnect_task)
+            self._reconnect_task = None
+
+    async def _reconnect(self) -> None:
+        while True:
+            if self._websocket or self._receive_task:
+                await self._disconnect()
+            await self._connect()
+            if self._websocket:
+                break
+            self._reconnect_attempts += 1
+            delay = min(2.0**self._reconnect_attempts, self.max_reconnect_delay_secs)
+            logger.warning(f"Gemini Live reconnect failed; retrying in {delay:.0f}s")
+            await asyncio.sleep(delay)
+
+        self._reconnect_attempts = 0
+        self._workspace = dsp.Workspace()
+        logger.info("Gemini Live connection ready")
+        # Flush before un-parking so live audio can't overtake the pre-roll.
+        for frame in self._preroll.drain():
+            await self._send_user_audio(frame)
+        while self._pending_messages:
+            await self._create_single_response(self._pending_messages.pop(0))
+        self._parked = False
+
+    def _buffer_preroll(self, frame: InputAudioRawFrame) -> None:
+        secs = self.preroll_secs
+        if self._reconnect_task and not self._reconnect_task.done():
+            # Keep what's said during the handshake, but not a whole outage.
+            secs += self.handshake_secs
+        self._preroll.append(frame, secs)
+
+    def _level(self, audio: bytes) -> float:
+        return dsp.level(audio, self._workspace)
@@ -7,6 +7,44 @@ class Settings(BaseSettings):
     google_multimodal_live_voice_id: str = "Puck"
     google_cloud_project: str
 
+    # Pipeline settings
+    session_idle_timeout_secs: float = 600
+    supervisor_mode: bool = False  # keep running and park the LLM when idle
+    llm_unpark_level: float = 0.02  # input RMS (0..1) that re-opens a parked LLM
+    input_gate: str = "off"  # off, vad or wake_word
+    input_gate_preroll_ms: int = 500
+    input_gate_close_secs: float = 2.0  # silence before the gate closes again
+    barge_in: bool = False  # interrupt locally when the user talks over the bot
+    barge_in_echo_ratio: float = 1.0  # mic must be this much louder than playback
+    barge_in_min_speech_ms: int = 120
+    audio_out_adaptive: bool = False  # grow/shrink the output buffer at runtime
+    audio_out_min_10ms_chunks: int = 4
+    audio_out_max_10ms_chunks: int = 12
+    recording: bool = False  # stream user and bot audio to disk per turn
+    recording_dir: str = "recordings"
+    recording_format: str = "wav"  # wav or flac (flac needs soundfile)
+    recording_max_total_mb: float = 500
+    hardware_backend: str = "pi"  # pi, or sim to run the display/sensor simulated
+    peripheral_process: bool = False  # run display and sensors in a child process
+    main_cpus: str = ""  # CPU list for the main process, e.g. "1-3"
+    peripheral_cpus: str = ""  # CPU list for the peripheral process, e.g. "0"
+    audio_realtime: bool = False  # SCHED_FIFO for the audio I/O threads if permitted
+    audio_rt_priority: int = 70  # 1-99
+    audio_cpus: str = ""  # CPU list for the audio I/O threads, e.g. "3"
+    moisture_sensor: bool = False  # tell the plant when its soil dries out
+    moisture_adc_cs: int = 26  # BCM pins of the ADC0834
+    moisture_adc_clk: int = 19
+    moisture_adc_dio: int = 21
+    moisture_adc_channel: int = 0
+    moisture_invert: bool = True  # most probes read higher when drier
+    moisture_dry_below: int = 80  # 0..255 after inversion, higher = wetter
+    moisture_soaked_above: int = 200
+    moisture_interval_secs: float = 5.0
+    heart_mode: str = "amplitude"  # amplitude (heart) or spectrum (8 band bars)
+    conversation_memory: bool = False  # remember past conversations across sessions
+    memory_db_path: str = "palm_9000_memory.db"
+    memory_max_turns: int = 20  # turns kept verbatim; older ones are summarized
+
     # Legacy settings
     picovoice_access_key: SecretStr = None
     porcupine_keyword: str = None
@@ -18,6 +56,12 @@ class Settings(BaseSettings):
     sample_rate: int = 44100
     silence_timeout: float = 1.0  # seconds of silence to trigger stop
     vad_mode: int = 3  # 0-3: 0 is least aggressive about filtering out non-speech
+    google_tts_voice_name: str = "Enceladus"
+    legacy_tts: str = "offline"  # offline (open_jtalk/espeak) or gemini
+    legacy_response_cache: bool = False  # replay answers to repeated questions
+    legacy_cache_max_entries: int = 32
+    legacy_cache_ttl_secs: float = 86400.0
+    legacy_cache_max_edits: int = 0  # >0 also hits transcripts this many edits away
 
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
@@ -0,0 +1,314 @@
+import threading
+import time
+
+from loguru import logger
+from pipecat.frames.frames import InputAudioRawFrame, OutputAudioRawFrame, StartFrame
+from pipecat.processors.frame_processor import FrameProcessor
+from pipecat.transports.local.audio import (
+    LocalAudioInputTransport,
+    LocalAudioOutputTransport,
+    LocalAudioTransport,
+    LocalAudioTransportParams,
+)
+
+from palm_9000.scheduling import LatencyStats, ThreadProfile
+
+# A gap longer than this between writes is a new utterance, not an underrun.
+_BURST_GAP_SECS = 0.35
+
+# pipecat only reads `audio_out_10ms_chunks` when the output starts, so to
+# resize writes mid-conversation the adaptive output sets this private
+# attribute of BaseOutputTransport and its MediaSenders, which re-chunk queued
+# audio to that size. pyproject pins pipecat, and tests/test_transports.py
+# fails if the attribute goes away.
+_CHUNK_SIZE_ATTR = "_audio_chunk_size"
+
+
+def can_resize_live(transport: LocalAudioOutputTransport) -> bool:
+    """Whether this pipecat version still has the attributes we resize."""
+    senders = getattr(transport, "_media_senders", None)
+    return (
+        hasattr(transport, _CHUNK_SIZE_ATTR)
+        and isinstance(senders, dict)
+        and all(hasattr(sender, _CHUNK_SIZE_ATTR) for sender in senders.values())
+    )
+
+
+class RealtimeLocalAudioInputTransport(LocalAudioInputTransport):
+    """
+    Local audio input that applies a `ThreadProfile` to PortAudio's callback
+    thread the first time it calls back, and records in `latency` how late
+    each callback is: the time since the previous one beyond a buffer period.
+    """
+
+    def __init__(
+        self,
+        py_audio,
+        params: LocalAudioTransportParams,
+        *,
+        profile: ThreadProfile | None = None,
+        report_secs: float = 60.0,
+    ) -> None:
+        super().__init__(py_audio, params)
+        self.profile = profile
+        self.report_secs = report_secs
+        self.latency = LatencyStats()
+        self._callback_thread: int | None = None
+        self._last_callback = 0.0
+
+    async def cleanup(self):
+        await super().cleanup()
+        self._last_callback = 0.0
+        logger.info(f"Audio input scheduling latency: {self.latency.summary()}")
+
+    async def push_audio_frame(self, frame: InputAudioRawFrame):
+        self.latency.report_every(self.report_secs, "Audio input")
+        await super().push_audio_frame(frame)
+
+    def _audio_in_callback(self, in_data, frame_count, time_info, status):
+        now = time.perf_counter()
+        thread = threading.get_native_id()
+        if thread != self._callback_thread:
+            # First callback, or PortAudio started a new thread.
+            self._callback_thread = thread
+            if self.profile:
+                self.profile.apply("audio input thread")
+        elif self._last_callback:
+            period = frame_count / self._sample_rate
+            self.latency.add(max(0.0, now - self._last_callback - period))
+        self._last_callback = now
+        return super()._audio_in_callback(in_data, frame_count, time_info, status)
+
+
+class RealtimeLocalAudioOutputTransport(LocalAudioOutputTransport):
+    """
+    Local audio output that applies a `ThreadProfile` to its writer thread, and
+    records in `latency` how long each write waited for that thread to pick it
+    up after the event loop handed it over.
+    """
+
+    def __init__(
+        self,
+        py_audio,
+        params: LocalAudioTransportParams,
+        *,
+        profile: ThreadProfile | None = None,
+        report_secs: float = 60.0,
+    ) -> None:
+        super().__init__(py_audio, params)
+        self.profile = profile
+        self.report_secs = report_secs
+        self.latency = LatencyStats()
+        self._profiled = False
+
+    async def start(self, frame: StartFrame):
+        await super().start(frame)
+        if self.profile and not self._profiled:
+            # The executor has a single thread, which does all the writes.
+            self._profiled = True
+            await self.get_event_loop().run_in_executor(
+                self._executor, self.profile.apply, "audio output thread"
+            )
+
+    async def cleanup(self):
+        await super().cleanup()
+        logger.info(f"Audio output scheduling latency: {self.latency.summary()}")
+
+    async def write_audio_frame(self, frame: OutputAudioRawFrame):
+        if self._out_stream:
+            await self._run_in_writer(self._out_stream.write, frame.audio)
+
+    async def _run_in_writer(self, func, *args):
+        self.latency.report_every(self.report_secs, "Audio output")
+        submitted = time.perf_counter()
+
+        def run():
+            self.latency.add(time.perf_counter() - submitted)
+            return func(*args)
+
+        return await self.get_event_loop().run_in_executor(self._executor, run)
+
+
+class RealtimeLocalAudioTransport(LocalAudioTransport):
+    """
+    `LocalAudioTransport` whose audio I/O threads get `profile` (CPU affinity
+    and SCHED_FIFO where permitted) and record their scheduling latency.
+    """
+
+    def __init__(
+        self, params: LocalAudioTransportParams, *, profile: ThreadProfile | None = None
+    ) -> None:
+        super().__init__(params)
+        self._profile = profile
+
+    def input(self) -> FrameProcessor:
+        if not self._input:
+            self._input = RealtimeLocalAudioInputTransport(
+                self._pyaudio, self._params, profile=self._profile
+            )
+        return self._input
+
+    def output(self) -> FrameProcessor:
+        if not self._output:
+            self._output = RealtimeLocalAudioOutputTransport(
+                self._pyaudio, self._params, profile=self._profile
+            )
+        return self._output
+
+
+class AdaptiveLocalAudioOutputTransport(RealtimeLocalAudioOutputTransport):
+    """
+    Local audio output whose write size (the `audio_out_10ms_chunks` buffer)
+    adapts at runtime instead of being hand-tuned per USB audio adapter.
+
+    Before every write it checks how much audio is still queued in the device.
+    If the device ran dry in the middle of an utterance, that's an underrun and
+    the buffer grows by `grow_step` chunks. After `shrink_after_secs` of
+    playback without an underrun it shrinks by one chunk, so latency settles
+    at the smallest size the device sustains within `[min_chunks, max_chunks]`.
+
+    The size is kept in `params.audio_out_10ms_chunks`, so a rebuilt pipeline
+    starts where the last one left off. If this pipecat version can't be
+    resized while running (`can_resize_live`), new sizes only take effect
+    then.
+
+    `stats` reports underruns and the current buffer depth.
+    """
+
+    def __init__(
+        self,
+        py_audio,
+        params: LocalAudioTransportParams,
+        *,
+        min_chunks: int = 4,
+        max_chunks: int = 12,
+        grow_step: int = 2,
+        shrink_after_secs: float = 20.0,
+        profile: ThreadProfile | None = None,
+    ) -> None:
+        super().__init__(py_audio, params, profile=profile)
+        self.min_chunks = min_chunks
+        self.max_chunks = max_chunks
+        self.grow_step = grow_step
+        self.shrink_after_secs = shrink_after_secs
+
+        self._transport_params = params
+        self._chunks = min(max(params.audio_out_10ms_chunks, min_chunks), max_chunks)
+        params.audio_out_10ms_chunks = self._chunks
+        self._live_resize = True
+        self._capacity = 0  # device buffer size in frames, measured when empty
+        self._device_queued = 0  # frames queued in the device before the last write
+        self._last_write_at = 0.0
+        self._clean_secs = 0.0
+        self.underruns = 0
+
+    @property
+    def stats(self) -> dict:
+        bytes_10ms = (
+            int(self.sample_rate / 100) * self._transport_params.audio_out_channels * 2
+        )
+        queued = sum(
+            s._audio_queue.qsize()
+            for s in getattr(self, "_media_senders", {}).values()
+            if getattr(s, "_audio_queue", None)
+        )
+        return {
+            "underruns": self.underruns,
+            "buffer_ms": self._chunks * 10,
+            "queued_ms": queued * self._chunks * 10,
+            "device_ms": 1000 * self._device_queued / max(self.sample_rate, 1),
+            "chunk_bytes": self._chunks * bytes_10ms,
+            "write_latency": self.latency.summary(),
+        }
+
+    async def start(self, frame: StartFrame):
+        await super().start(frame)
+        if self._out_stream:
+            self._capacity = self._out_stream.get_write_available()
+        if self._live_resize and not can_resize_live(self):
+            self._live_resize = False
+            logger.error(
+                "This pipecat version can't resize output writes while running; "
+                "buffer changes will apply when the pipeline restarts"
+            )
+
+    async def write_audio_frame(self, frame: OutputAudioRawFrame):
+        if not self._out_stream:
+            return
+        queued = await self._run_in_writer(self._write, frame.audio)
+        now = time.monotonic()
+        in_burst = now - self._last_write_at < _BURST_GAP_SECS
+        self._last_write_at = now
+        self._device_queued = queued
+        if not in_burst:
+            return
+
+        if queued == 0:
+            self.underruns += 1
+            logger.debug(f"Output underrun #{self.underruns}")
+            self._clean_secs = 0.0
+            self._set_chunks(self._chunks + self.grow_step)
+            return
+
+        self._clean_secs += len(frame.audio) / (
+            self.sample_rate * 2 * self._transport_params.audio_out_channels
+        )
+        if self._clean_secs >= self.shrink_after_secs:
+            self._clean_secs = 0.0
+            self._set_chunks(self._chunks - 1)
+
+    def _write(self, audio: bytes) -> int:
+        """Runs in the writer thread. Returns the frames queued before writing."""
+        queued = self._capacity - self._out_stream.get_write_available()
+        self._out_stream.write(audio)
+        return max(queued, 0)
+
+    def _set_chunks(self, chunks: int) -> None:
+        chunks = min(max(chunks, self.min_chunks), self.max_chunks)
+        if chunks == self._chunks:
+            return
+        self._chunks = chunks
+        self._transport_params.audio_out_10ms_chunks = chunks
+        if self._live_resize:
+            # The media senders re-chunk incoming audio to this size before
+            # queueing it for `write_audio_frame`.
+            size = (
+                int(self.sample_rate / 100)
+                * self._transport_params.audio_out_channels
+                * 2
+                * chunks
+            )
+            setattr(self, _CHUNK_SIZE_ATTR, size)
+            for sender in self._media_senders.values():
+                setattr(sender, _CHUNK_SIZE_ATTR, size)
+        logger.info(f"Output buffer now {chunks * 10} ms ({self.stats})")
+
+
+class AdaptiveLocalAudioTransport(RealtimeLocalAudioTransport):
+    """
+    `RealtimeLocalAudioTransport` with an `AdaptiveLocalAudioOutputTransport`
+    output.
+    """
+
+    def __init__(
+        self,
+        params: LocalAudioTransportParams,
+        *,
+        min_chunks: int = 4,
+        max_chunks: int = 12,
+        profile: ThreadProfile | None = None,
+    ) -> None:
+        super().__init__(params, profile=profile)
+        self._min_chunks = min_chunks
+        self._max_chunks = max_chunks
+
+    def output(self) -> FrameProcessor:
+        if not self._output:
+            self._output = AdaptiveLocalAudioOutputTransport(
+                self._pyaudio,
+                self._params,
+                min_chunks=self._min_chunks,
+                max_chunks=self._max_chunks,
+                profile=self._profile,
+            )
+        return self._output
@@ -1,12 +1,12 @@
-import io
 import time
-import wave
 
 import numpy as np
 import pyaudio
 import sounddevice as sd
 from scipy.signal import resample_poly
 
+from palm_9000 import dsp
+
 
 def resample(
     audio: np.ndarray, original_sample_rate: int, target_sample_rate: int
@@ -23,43 +23,31 @@ def resample(
     return resample_poly(audio, target_sample_rate // gcd, original_sample_rate // gcd)
 
 
-def play_audio(audio: bytes, sample_rate=16000, volume=1.0):
+def play_audio(audio: bytes, sample_rate=16000, volume=1.0, block_size=1024):
     """
     volume is a multiplier for the audio volume, so 1.0 is normal volume, 2.0 is double the volume, etc.
     Don't set it too high (>=3) or it will clip and distort the audio.
     """
-    # Convert raw bytes to NumPy array of int16 samples
+    # View the raw bytes as int16 samples (no copy)
     pcm = np.frombuffer(audio, dtype=np.int16)
 
-    # Apply volume gain (with clipping to int16 range)
-    amplified = np.clip(pcm * volume, -32768, 32767).astype(np.int16)
-
-    # Convert back to bytes
-    amplified_bytes = amplified.tobytes()
-
-    # Wrap PCM data in WAV headers in-memory
-    buffer = io.BytesIO()
-    with wave.open(buffer, "wb") as wf:
-        wf.setnchannels(1)
-        wf.setsampwidth(2)  # 16-bit PCM
-        wf.setframerate(sample_rate)
-        wf.writeframes(amplified_bytes)
-
-    buffer.seek(0)
+    # Apply volume gain block by block (saturating at the int16 range), so
+    # the only buffers are one block of output and one of scratch.
+    block = np.empty(block_size, dtype=np.int16)
+    scratch = np.empty(block_size, dtype=np.float32)
 
-    # Play audio with PyAudio
-    wf = wave.open(buffer, "rb")
+    # Play audio with PyAudio (mono 16-bit PCM)
     pa = pyaudio.PyAudio()
     stream = pa.open(
-        format=pa.get_format_from_width(wf.getsampwidth()),
-        channels=wf.getnchannels(),
-        rate=wf.getframerate(),
+        format=pyaudio.paInt16,
+        channels=1,
+        rate=sample_rate,
         output=True,
     )
-    data = wf.readframes(1024)
-    while data:
-        stream.write(data)
-        data = wf.readframes(1024)
+    for start in range(0, pcm.size, block_size):
+        n = min(block_size, pcm.size - start)
+        dsp.apply_gain(pcm[start : start + n], volume, block[:n], scratch[:n])
+        stream.write(block[:n].tobytes())
 
     stream.stop_stream()
     stream.close()
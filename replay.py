@@ -0,0 +1,116 @@
+"""
+Replay recorded utterances through the main pipeline (`palm_9000/app.py`)
+against a local Gemini Live stand-in and report latency and load per scenario.
+
+    uv run replay.py recordings/*.wav --response replies/hello_24k.wav --delay 0.6
+
+Each input WAV (16 kHz, 16-bit mono) is one scenario. Trim trailing silence
+from the inputs: end-to-end latency is measured from the last input sample to
+the first bot sample written to the output device.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from pathlib import Path
+
+from pipecat.pipeline.runner import PipelineRunner
+from pipecat.services.gemini_multimodal_live.gemini import (
+    InputParams as GeminiMultimodalLiveInputParams,
+)
+from pipecat.transcriptions.language import Language
+from pipecat.transports.base_transport import TransportParams
+
+from palm_9000.app import SYSTEM_INSTRUCTION, build_pipeline_task
+from palm_9000.replay import (
+    EventLoopLagMonitor,
+    FakeGeminiLiveServer,
+    LocalGeminiLiveLLMService,
+    ScenarioResult,
+    WavTransport,
+    read_wav,
+    summarize,
+    wait_for_reply,
+)
+
+
+async def run_scenario(
+    input_path: Path,
+    responses: list[bytes],
+    *,
+    response_delay_secs: float,
+    out_dir: Path | None,
+    timeout: float,
+) -> ScenarioResult:
+    params = TransportParams(
+        audio_in_enabled=True,
+        audio_in_channels=1,
+        audio_in_sample_rate=16000,
+        audio_out_enabled=True,
+        audio_out_channels=1,
+        audio_out_sample_rate=24000,
+        audio_out_10ms_chunks=8,
+    )
+    output_path = out_dir / f"{input_path.stem}.out.wav" if out_dir else None
+    transport = WavTransport(read_wav(input_path, 16000), params, output_path)
+
+    async with FakeGeminiLiveServer(
+        responses, response_delay_secs=response_delay_secs
+    ) as server:
+        llm = LocalGeminiLiveLLMService(
+            server,
+            system_instruction=SYSTEM_INSTRUCTION,
+            params=GeminiMultimodalLiveInputParams(language=Language.JA),
+        )
+        task = build_pipeline_task(transport, llm)
+        runner = PipelineRunner(handle_sigint=False)
+
+        lag = EventLoopLagMonitor()
+        lag.start()
+        wall0, cpu0 = time.monotonic(), time.process_time()
+        run = asyncio.create_task(runner.run(task))
+        try:
+            await wait_for_reply(transport, timeout=timeout)
+        finally:
+            await task.stop_when_done()
+            await run
+            wall, cpu = time.monotonic() - wall0, time.process_time() - cpu0
+            await lag.stop()
+
+        return summarize(input_path.stem, transport, server, lag, wall, cpu)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("inputs", nargs="+", type=Path, help="16 kHz mono WAVs")
+    parser.add_argument(
+        "--response",
+        action="append",
+        type=Path,
+        required=True,
+        help="24 kHz mono WAV replayed as the bot reply (repeat to cycle)",
+    )
+    parser.add_argument("--delay", type=float, default=0.5, help="server think time")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--out-dir", type=Path, help="capture output audio here")
+    parser.add_argument("--json", action="store_true", help="print JSON lines")
+    args = parser.parse_args()
+
+    responses = [read_wav(p, FakeGeminiLiveServer.SAMPLE_RATE) for p in args.response]
+    if args.out_dir:
+        args.out_dir.mkdir(parents=True, exist_ok=True)
+
+    for input_path in args.inputs:
+        result = await run_scenario(
+            input_path,
+            responses,
+            response_delay_secs=args.delay,
+            out_dir=args.out_dir,
+            timeout=args.timeout,
+        )
+        print(json.dumps(result.model_dump()) if args.json else result)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,104 @@
+"""
+Run with `uv run python -m unittest discover tests`.
+"""
+
+import time
+import unittest
+
+import numpy as np
+
+from palm_9000.adc0834 import ADC0834
+from palm_9000.gpio import Max7219AmplitudeHeart, Max7219Spectrum
+from palm_9000.hardware import SimulatedADC0834, SimulatedGPIO, SimulatedMax7219
+
+PINS = dict(cs=26, clk=19, dio=21)
+# Clock half-periods per ADC0834 read: 4 mux bits, the settling half cycle,
+# and 8 + 8 data bits.
+TICKS_PER_READ = 4 * 2 + 1 + 8 * 2 + 8 * 2
+
+
+class SimulatedADC0834Test(unittest.TestCase):
+    def setUp(self):
+        self.gpio = SimulatedGPIO()
+        self.sim = SimulatedADC0834(self.gpio, values={0: 17, 3: 200}, **PINS)
+        self.adc = ADC0834(gpio=self.gpio, **PINS).setup()
+
+    def test_round_trip(self):
+        for value in (0, 1, 128, 254, 255):
+            with self.subTest(value=value):
+                self.sim.set_value(1, value)
+                self.assertEqual(self.adc.read(1), value)
+        self.assertEqual(self.adc.read(0), 17)
+        self.assertEqual(self.adc.read(3), 200)
+        self.assertEqual(self.adc.read(2), 0)  # not scripted
+
+    def test_scripted_sequence_holds_last(self):
+        self.sim.set_value(0, [10, 20])
+        self.assertEqual([self.adc.read(0) for _ in range(3)], [10, 20, 20])
+
+    def test_gpio_traffic_per_read(self):
+        self.adc.read(0)  # the first read also moves the pins out of setup state
+        self.sim.conversions = 0
+        self.gpio.reset_counters()
+        reads = 5
+        for _ in range(reads):
+            self.adc.read(0)
+        self.assertEqual(sum(self.gpio.transitions.values()), 44 * reads)
+        self.assertEqual(sum(self.gpio.stats.calls.values()), 66 * reads)
+        self.assertEqual(self.sim.conversions, reads)
+
+    def test_read_timing(self):
+        reads = 5
+        t0 = time.perf_counter()
+        for _ in range(reads):
+            self.adc.read(0)
+        per_read = (time.perf_counter() - t0) / reads
+        # At least the clock the driver promises, and nowhere near the
+        # moisture sampling interval.
+        self.assertGreaterEqual(per_read, TICKS_PER_READ / (2 * self.adc.frequency))
+        self.assertLess(per_read, 0.05)
+
+
+class SimulatedMax7219Test(unittest.TestCase):
+    def test_spectrum_frame(self):
+        serial = SimulatedMax7219()
+        spectrum = Max7219Spectrum(serial=serial, ema=1.0, gamma=1.0)
+        serial.reset_counters()
+
+        spectrum.set_bands(np.arange(8) / 8)
+        spectrum._render()
+
+        # One bar per column, as high as its band level.
+        np.testing.assert_array_equal(serial.framebuffer.sum(axis=0), np.arange(8))
+        self.assertEqual(serial.spi_bytes, 8 * 2)
+        self.assertEqual(serial.transactions, 8)
+        self.assertEqual(serial.stats.calls["data"], 8)
+
+    def test_unchanged_spectrum_frame_writes_nothing(self):
+        serial = SimulatedMax7219()
+        spectrum = Max7219Spectrum(serial=serial, ema=1.0, gamma=1.0)
+        spectrum.set_bands(np.full(8, 0.5))
+        spectrum._render()
+        serial.reset_counters()
+
+        spectrum._render()
+        self.assertEqual(serial.spi_bytes, 0)
+        self.assertEqual(sum(serial.stats.calls.values()), 0)
+
+    def test_heart_frame(self):
+        serial = SimulatedMax7219()
+        heart = Max7219AmplitudeHeart(serial=serial)
+        serial.reset_counters()
+
+        heart.process_audio(np.full(256, 16384, np.int16).tobytes())
+        heart._render()
+
+        # The contrast command, then one write per digit register.
+        self.assertEqual(serial.spi_bytes, 2 + 8 * 2)
+        self.assertEqual(serial.stats.calls["data"], 9)
+        self.assertEqual(int(serial.framebuffer.sum()), 28)  # the heart's pixels
+        self.assertGreater(serial.intensity, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+"""
+Run with `uv run python -m unittest discover tests`.
+"""
+
+import unittest
+
+from palm_9000.legacy.language import detect_language, split_by_language
+
+
+class DetectLanguageTest(unittest.TestCase):
+    def test_scripts(self):
+        self.assertEqual(detect_language("こんにちは、元気？"), "ja")
+        self.assertEqual(detect_language("大丈夫"), "ja")
+        self.assertEqual(detect_language("Hello there, how are you?"), "en")
+
+    def test_accented_latin_goes_to_espeak(self):
+        self.assertEqual(detect_language("Café time."), "en")
+        self.assertEqual(detect_language("What a naïve idea."), "en")
+
+    def test_no_letters_gets_default(self):
+        # The orchestrator's sentence splitter produces these.
+        for text in ["1.", "42!", "……。"]:
+            with self.subTest(text=text):
+                self.assertEqual(detect_language(text), "ja")
+                self.assertEqual(detect_language(text, default="en"), "en")
+
+
+class SplitByLanguageTest(unittest.TestCase):
+    def test_single_language(self):
+        self.assertEqual(split_by_language("Good morning."), [("en", "Good morning.")])
+
+    def test_accented_latin(self):
+        self.assertEqual(split_by_language("Café time."), [("en", "Café time.")])
+        self.assertEqual(
+            split_by_language("カフェはCafé au laitです"),
+            [("ja", "カフェは"), ("en", "Café au lait"), ("ja", "です")],
+        )
+
+    def test_mixed(self):
+        self.assertEqual(
+            split_by_language("今日はGood morningです。"),
+            [("ja", "今日は"), ("en", "Good morning"), ("ja", "です。")],
+        )
+
+    def test_letterless_runs_join_their_neighbours(self):
+        self.assertEqual(
+            split_by_language("iPhone 15を買った"),
+            [("en", "iPhone 15"), ("ja", "を買った")],
+        )
+
+    def test_no_letters_gets_default(self):
+        self.assertEqual(split_by_language("1."), [("ja", "1.")])
+        self.assertEqual(split_by_language("1.", default="en"), [("en", "1.")])
+        self.assertEqual(split_by_language("……。"), [("ja", "……。")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+"""
+Run with `uv run python -m unittest discover tests`.
+"""
+
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+class SpawnedChildImportsTest(unittest.TestCase):
+    def test_child_does_not_load_the_pipeline(self):
+        # What a "spawn" child of `uv run main.py` imports before it runs
+        # `_peripheral_main`: main.py as `__mp_main__`, then the target's module.
+        code = (
+            "import sys, multiprocessing.spawn as spawn\n"
+            "spawn.import_main_path('main.py')\n"
+            "import palm_9000.peripherals\n"
+            "print(sorted(m for m in ('pipecat', 'google.genai', 'torch')"
+            " if m in sys.modules))\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        self.assertEqual(result.stdout.strip(), "[]")
+
+
+if __name__ == "__main__":
+    unittest.main()
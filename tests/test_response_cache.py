@@ -0,0 +1,110 @@
+"""
+Run with `uv run python -m unittest discover tests`.
+"""
+
+import unittest
+
+from palm_9000.legacy.response_cache import ResponseCache, edit_distance, normalize
+from palm_9000.legacy.text_to_speech import TextToSpeechResult
+
+AUDIO = [TextToSpeechResult(audio_data=b"\0\0", sample_rate=16000)]
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class NormalizeTest(unittest.TestCase):
+    def test_full_width_and_case(self):
+        self.assertEqual(normalize("ＡＢＣ １２３"), "abc123")
+        self.assertEqual(normalize("Are You Thirsty?"), "areyouthirsty")
+
+    def test_katakana_as_hiragana(self):
+        self.assertEqual(normalize("ゲンキ"), "げんき")
+        self.assertEqual(normalize("ｹﾞﾝｷ"), "げんき")  # half-width
+
+    def test_prolonged_sound_runs(self):
+        self.assertEqual(normalize("元気ーーー〜〜！"), "元気ー")
+        self.assertEqual(normalize("元気〜"), normalize("元気ー"))
+
+    def test_punctuation_and_whitespace(self):
+        self.assertEqual(normalize("元気？"), normalize("元気 ?"))
+
+
+class EditDistanceTest(unittest.TestCase):
+    def test_distance(self):
+        self.assertEqual(edit_distance("kitten", "sitting", 5), 3)
+        self.assertEqual(edit_distance("げんき", "げんき", 1), 0)
+
+    def test_stops_past_limit(self):
+        self.assertEqual(edit_distance("kitten", "sitting", 1), 2)
+        self.assertEqual(edit_distance("a", "abcdef", 2), 3)
+
+
+class ResponseCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def cache(self, **kwargs) -> ResponseCache:
+        return ResponseCache(clock=self.clock, **kwargs)
+
+    def test_normalized_hit(self):
+        cache = self.cache()
+        cache.put("元気？", "元気だよ", AUDIO)
+        self.assertEqual(cache.get("元気!").text, "元気だよ")
+        self.assertEqual((cache.hits, cache.misses), (1, 0))
+
+    def test_exact_by_default(self):
+        cache = self.cache()
+        cache.put("turn on the light", "Turning it on.", AUDIO)
+        self.assertIsNone(cache.get("turn off the light"))
+        self.assertIsNone(cache.get("are you thursty"))
+
+    def test_fuzzy_hit(self):
+        cache = self.cache(max_edits=1)
+        cache.put("are you thirsty", "Always.", AUDIO)
+        cache.put("あなたはだれですか", "PALM-9000です。", AUDIO)
+        self.assertEqual(cache.get("are you thursty").text, "Always.")
+        self.assertEqual(cache.get("あなたはだれでずか").text, "PALM-9000です。")
+
+    def test_fuzzy_miss_on_opposite_question(self):
+        cache = self.cache(max_edits=1)
+        cache.put("turn on the light", "Turning it on.", AUDIO)
+        # Bigram similarity 0.84, but two edits away.
+        self.assertIsNone(cache.get("turn off the light"))
+        self.assertIsNone(cache.get("what time is it"))
+
+    def test_ttl_expiry(self):
+        cache = self.cache(ttl_secs=60)
+        cache.put("元気？", "元気だよ", AUDIO)
+        self.clock.now = 59
+        self.assertIsNotNone(cache.get("元気？"))
+        self.clock.now = 61
+        self.assertIsNone(cache.get("元気？"))
+        self.assertEqual(len(cache), 0)
+
+    def test_lru_eviction(self):
+        cache = self.cache(max_entries=2)
+        cache.put("one", "1", AUDIO)
+        cache.put("two", "2", AUDIO)
+        cache.get("one")  # now the most recently used
+        cache.put("three", "3", AUDIO)
+        self.assertIsNone(cache.get("two"))
+        self.assertEqual(cache.get("one").text, "1")
+        self.assertEqual(cache.get("three").text, "3")
+        self.assertEqual(len(cache), 2)
+
+    def test_replacing_an_entry(self):
+        cache = self.cache(max_edits=1)
+        cache.put("are you thirsty", "Always.", AUDIO)
+        cache.put("Are you thirsty?", "Not now.", AUDIO)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.get("are you thursty").text, "Not now.")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+"""
+Run with `uv run python -m unittest discover tests`.
+"""
+
+import unittest
+
+from websockets.exceptions import ConnectionClosedError, ConnectionClosedOK
+from websockets.frames import Close
+
+from palm_9000.session import ParkableGeminiLiveLLMService
+
+
+class ClosingSocket:
+    """Ends the receive loop the way websockets does on a close."""
+
+    def __init__(self, error: Exception | None = None) -> None:
+        self.error = error
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.error:
+            raise self.error
+        raise StopAsyncIteration
+
+
+class ReceiveTaskTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.service = ParkableGeminiLiveLLMService(api_key="x")
+        self.reconnects = 0
+
+        def schedule_reconnect():
+            self.reconnects += 1
+
+        self.service._schedule_reconnect = schedule_reconnect
+
+    async def receive(self, socket: ClosingSocket) -> None:
+        self.service._websocket = socket
+        await self.service._receive_task_handler()
+
+    async def test_reconnects_after_clean_close(self):
+        await self.receive(ClosingSocket())
+        self.assertEqual(self.reconnects, 1)
+        self.assertIsNone(self.service._websocket)
+
+    async def test_reconnects_after_abnormal_close(self):
+        await self.receive(ClosingSocket(ConnectionClosedError(None, None)))
+        await self.receive(
+            ClosingSocket(ConnectionClosedOK(Close(1000, "session limit"), None))
+        )
+        self.assertEqual(self.reconnects, 2)
+
+    async def test_no_reconnect_when_parked(self):
+        self.service._parked = True
+        await self.receive(ClosingSocket(ConnectionClosedError(None, None)))
+        self.assertEqual(self.reconnects, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
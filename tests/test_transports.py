@@ -0,0 +1,54 @@
+"""
+Run with `uv run python -m unittest discover tests`.
+"""
+
+import inspect
+import unittest
+
+from pipecat.transports.base_output import BaseOutputTransport
+from pipecat.transports.local.audio import LocalAudioTransportParams
+
+from palm_9000.transports import (
+    _CHUNK_SIZE_ATTR,
+    AdaptiveLocalAudioOutputTransport,
+    can_resize_live,
+)
+
+
+class PipecatInternalsTest(unittest.TestCase):
+    """
+    The adaptive output resizes writes through private pipecat attributes.
+    If these fail after a pipecat upgrade, port `_set_chunks` before bumping
+    the pin in pyproject.
+    """
+
+    def setUp(self):
+        self.params = LocalAudioTransportParams(
+            audio_out_enabled=True, audio_out_10ms_chunks=8
+        )
+        self.output = AdaptiveLocalAudioOutputTransport(None, self.params)
+        self.sender = BaseOutputTransport.MediaSender(
+            self.output,
+            destination=None,
+            sample_rate=24000,
+            audio_chunk_size=480 * 8,
+            params=self.params,
+        )
+        self.output._media_senders[None] = self.sender
+
+    def test_attributes_exist(self):
+        self.assertTrue(can_resize_live(self.output))
+
+    def test_media_sender_chunks_by_attribute(self):
+        source = inspect.getsource(BaseOutputTransport.MediaSender)
+        self.assertIn(f"self.{_CHUNK_SIZE_ATTR}]", source)
+
+    def test_set_chunks_resizes_senders_and_params(self):
+        self.output._sample_rate = 24000
+        self.output._set_chunks(10)
+        self.assertEqual(getattr(self.sender, _CHUNK_SIZE_ATTR), 480 * 10)
+        self.assertEqual(self.params.audio_out_10ms_chunks, 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+"""
+Run with `uv run python -m unittest discover tests`.
+"""
+
+import unittest
+
+from pipecat.frames.frames import InputAudioRawFrame
+
+from palm_9000.legacy.vad import FrameVad, PrerollBuffer
+
+SAMPLE_RATE = 16000
+
+
+def silence(ms: int) -> bytes:
+    return bytes(SAMPLE_RATE * ms // 1000 * 2)
+
+
+class FrameVadTest(unittest.TestCase):
+    def test_rechunks_into_whole_frames(self):
+        vad = FrameVad(frame_duration_ms=20)
+        self.assertEqual(list(vad.frames(silence(15), SAMPLE_RATE)), [])
+        frames = list(vad.frames(silence(30), SAMPLE_RATE))
+        self.assertEqual(len(frames), 2)  # 45 ms in, 5 ms left over
+        self.assertTrue(all(len(f) == len(silence(20)) for f, _ in frames))
+        self.assertFalse(any(is_speech for _, is_speech in frames))
+
+    def test_clear_drops_partial_frame(self):
+        vad = FrameVad(frame_duration_ms=20)
+        vad.is_speech(silence(15), SAMPLE_RATE)
+        vad.clear()
+        self.assertEqual(list(vad.frames(silence(15), SAMPLE_RATE)), [])
+
+    def test_trigger_is_optional(self):
+        self.assertIsNone(FrameVad().trigger)
+        vad = FrameVad(padding_duration_ms=100)
+        self.assertFalse(vad.is_speech(silence(200), SAMPLE_RATE))
+        self.assertFalse(vad.triggered)
+        self.assertEqual(len(vad.trigger.ring_buffer), 5)
+
+
+class PrerollBufferTest(unittest.TestCase):
+    def frame(self, ms: int) -> InputAudioRawFrame:
+        return InputAudioRawFrame(
+            audio=silence(ms), sample_rate=SAMPLE_RATE, num_channels=1
+        )
+
+    def test_keeps_the_newest_audio(self):
+        preroll = PrerollBuffer(0.1)
+        frames = [self.frame(40) for _ in range(4)]
+        dropped = sum(preroll.append(f) for f in frames)
+        self.assertEqual(dropped, len(silence(80)))
+        self.assertEqual(preroll.bytes, len(silence(80)))
+        self.assertEqual(list(preroll.drain()), frames[2:])
+        self.assertEqual((len(preroll), preroll.bytes), (0, 0))
+
+    def test_longer_limit_per_call(self):
+        preroll = PrerollBuffer(0.1)
+        for _ in range(4):
+            self.assertEqual(preroll.append(self.frame(40), secs=1.0), 0)
+        self.assertEqual(len(preroll), 4)
+
+    def test_keeps_at_least_one_frame(self):
+        preroll = PrerollBuffer(0.0)
+        preroll.append(self.frame(40))
+        frame = self.frame(40)
+        preroll.append(frame)
+        self.assertEqual(list(preroll.drain()), [frame])
+
+
+if __name__ == "__main__":
+    unittest.main()